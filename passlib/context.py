@@ -6,6 +6,7 @@ from __future__ import with_statement
 # core
 from math import log as logb, ceil
 import logging; log = logging.getLogger(__name__)
+import re
 from time import sleep
 from warnings import warn
 # site
@@ -13,10 +14,11 @@ from warnings import warn
 from passlib.exc import PasslibConfigWarning, ExpectedStringError, ExpectedTypeError
 from passlib.registry import get_crypt_handler, _validate_handler_name
 from passlib.utils import rng, tick, to_bytes, deprecated_method, \
-                          to_unicode, splitcomma
+                          to_unicode, splitcomma, _thread_map
 from passlib.utils.compat import iteritems, num_types, \
                                  PY2, PY3, unicode, SafeConfigParser, \
                                  NativeStringIO, BytesIO, unicode_or_bytes_types
+import passlib.utils.handlers as uh
 # local
 __all__ = [
     'CryptContext',
@@ -61,6 +63,27 @@ def _is_handler_registered(handler):
     """detect if handler is registered or a custom handler"""
     return get_crypt_handler(handler.name, None) is handler
 
+def _get_ident_prefixes(handler):
+    """return tuple of prefixes which handler's identify() checks for,
+    or ``None`` if it does anything more than a prefix check.
+    """
+    identify = getattr(handler.identify, "__func__", None)
+    if identify is uh.GenericHandler.identify.__func__:
+        if handler.ident:
+            return (handler.ident,)
+    elif identify is uh.HasManyIdents.identify.__func__:
+        prefixes = tuple(handler.ident_values)
+        if all(prefixes):
+            return prefixes
+    return None
+
+def _releases_gil(handler):
+    """check if handler's active backend is known to release the GIL,
+    via its optional ``_releases_gil()`` hook (used by verify_many()).
+    """
+    check = getattr(handler, "_releases_gil", None)
+    return bool(check and check())
+
 #=============================================================================
 # crypt policy
 #=============================================================================
@@ -1005,6 +1028,11 @@ class _CryptConfig(object):
     # in order of schemes(). populated on demand by _get_record_list()
     _record_lists = None
 
+    # dict mapping category -> compiled regex matching the ident prefixes
+    # of all records for that category (or None if some record can't be
+    # identified by prefix alone). populated on demand by _get_ident_regex()
+    _ident_regexes = None
+
     #===================================================================
     # constructor
     #===================================================================
@@ -1315,6 +1343,7 @@ class _CryptConfig(object):
         #       this is why we create all the records now,
         #       so CryptContext throws error immediately rather than later.
         self._record_lists = {}
+        self._ident_regexes = {}
         records = self._records = {}
         get_options = self._get_record_options_with_flag
         categories = self.categories
@@ -1426,6 +1455,35 @@ class _CryptConfig(object):
             ]
         return value
 
+    def _get_ident_regex(self, category=None):
+        """return regex matching ident prefixes of records for category (cached)
+
+        group ``i+1`` of the regex corresponds to ``_get_record_list()[i]``.
+        returns ``None`` if any of the records can't be identified by a
+        constant prefix alone (e.g. hex digests, wrapped handlers).
+
+        this is an internal helper used only by identify_record()
+        """
+        try:
+            return self._ident_regexes[category]
+        except KeyError:
+            pass
+        groups = []
+        for record in self._get_record_list(category):
+            prefixes = _get_ident_prefixes(record.handler)
+            if not prefixes:
+                groups = None
+                break
+            groups.append("(%s)" % "|".join(re.escape(prefix)
+                                            for prefix in prefixes))
+        # NOTE: older pythons limit regexes to 100 groups.
+        if groups and len(groups) < 100:
+            value = re.compile("|".join(groups))
+        else:
+            value = None
+        self._ident_regexes[category] = value
+        return value
+
     def identify_record(self, hash, category, required=True):
         """internal helper to identify appropriate _CryptRecord for hash"""
         # NOTE: this is part of the critical path shared by
@@ -1435,14 +1493,22 @@ class _CryptConfig(object):
         #        this will only return first match. might want to do something
         #        about this in future, but for now only hashes with
         #        unique identifiers will work properly in a CryptContext.
-        # XXX: if all handlers have a unique prefix (e.g. all are MCF / LDAP),
-        #      could use dict-lookup to speed up this search.
         if not isinstance(hash, unicode_or_bytes_types):
             raise ExpectedStringError(hash, "hash")
         # type check of category - handled by _get_record_list()
-        for record in self._get_record_list(category):
-            if record.identify(hash):
-                return record
+        pat = self._get_ident_regex(category)
+        if pat is not None:
+            # all handlers have a constant prefix (e.g. all are MCF / LDAP),
+            # so check all of them in a single regex match. since alternation
+            # is tried left to right, this returns the same record as the
+            # loop below.
+            match = pat.match(uh.to_unicode_for_identify(hash))
+            if match:
+                return self._get_record_list(category)[match.lastindex-1]
+        else:
+            for record in self._get_record_list(category):
+                if record.identify(hash):
+                    return record
         if not required:
             return None
         elif not self.schemes:
@@ -2562,6 +2628,41 @@ class CryptContext(object):
         record = self._get_or_identify_record(hash, scheme, category)
         return record.verify(secret, hash, **kwds)
 
+    def verify_many(self, pairs, scheme=None, category=None, max_workers=None,
+                    **kwds):
+        """verify a batch of ``(secret, hash)`` pairs.
+
+        :arg pairs: iterable of ``(secret, hash)`` tuples.
+        :param max_workers: number of threads to use (defaults to the cpu count).
+
+        All other arguments are the same as :meth:`verify`.
+
+        :returns: list of :meth:`verify` results, in the same order as *pairs*.
+
+        .. note::
+
+            This only parallelizes C backends which release the GIL
+            (currently the pbkdf2 hashes when using ``hashlib`` / ``fastpbkdf2``,
+            and :class:`~passlib.hash.bcrypt` when using the ``bcrypt`` package).
+            The pairs are verified in a thread pool only if *every* hash uses
+            such a backend. In all other cases, which includes all pure-python
+            backends, they're verified serially; this gives no speedup over
+            calling :meth:`!verify` in a loop. The same happens if
+            :mod:`!concurrent.futures` isn't available or there's only one cpu.
+
+        .. versionadded:: 1.7
+        """
+        # NOTE: looking up all the records first also means unrecognized
+        #       hashes are rejected before any verification is done.
+        pairs = list(pairs)
+        get_record = self._get_or_identify_record
+        records = [get_record(hash, scheme, category) for _, hash in pairs]
+        threaded = all(_releases_gil(record.handler) for record in set(records))
+        def helper(item):
+            record, (secret, hash) = item
+            return record.verify(secret, hash, **kwds)
+        return list(_thread_map(helper, zip(records, pairs), threaded, max_workers))
+
     def verify_and_update(self, secret, hash, scheme=None, category=None, **kwds):
         """verify password and re-hash the password if needed, all in a single call.
 
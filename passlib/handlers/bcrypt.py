@@ -234,6 +234,18 @@ class bcrypt(uh.HasManyIdents, uh.HasRounds, uh.HasSalt, uh.HasManyBackends, uh.
     # appended to HasManyBackends' "no backends available" error message
     _no_backend_suggestion = " -- recommend you install one (e.g. 'pip install bcrypt')"
 
+    @classmethod
+    def _releases_gil(cls):
+        """check if the active backend releases the GIL
+        (used by :meth:`CryptContext.verify_many` to decide whether to use threads)"""
+        # NOTE: the 'bcrypt' package releases the GIL while hashing;
+        #       the other backends aren't known to.
+        try:
+            return cls.get_backend() == "bcrypt"
+        except uh.exc.MissingBackendError:
+            # let verify() report the missing backend
+            return False
+
     def _calc_checksum(self, secret):
         "common backend code"
         if isinstance(secret, unicode):
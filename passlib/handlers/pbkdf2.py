@@ -3,14 +3,17 @@
 # imports
 #=============================================================================
 # core
-from binascii import hexlify, unhexlify
-from base64 import b64encode, b64decode
-import logging; log = logging.getLogger(__name__)
+from binascii import hexlify, unhexlify, Error as _BinasciiError
+from base64 import b64encode, urlsafe_b64encode, urlsafe_b64decode
+import sys
 # site
 # pkg
-from passlib.utils import ab64_decode, ab64_encode, to_unicode
-from passlib.utils.compat import str_to_bascii, u, uascii_to_str, unicode
-from passlib.utils.pbkdf2 import pbkdf2
+from passlib.utils import ab64_decode, ab64_encode, consteq, to_unicode, \
+                          _thread_map
+from passlib.utils import b64ct
+from passlib.utils.compat import str_to_bascii, u, uascii_to_str, unicode, \
+                                  unicode_or_bytes_types
+from passlib.utils.pbkdf2 import pbkdf2_hmac, _get_pbkdf2_hmac_backend
 import passlib.utils.handlers as uh
 # local
 __all__ = [
@@ -22,10 +25,80 @@ __all__ = [
     "grub_pbkdf2_sha512",
 ]
 
+#=============================================================================
+# helpers
+#=============================================================================
+
+#: max number of parsed hashes kept by _parse_cached() (cache is reset once full)
+_PARSE_CACHE_SIZE = 4096
+
+#: cache used by _parse_cached(), maps ``(handler, hash) -> handler._parse_hash(hash)``
+_parse_cache = {}
+
+def _parse_cached(handler, hash):
+    """from_string() helper -- returns ``handler._parse_hash(hash)``,
+    memoizing the result so applications which repeatedly verify the same hash
+    don't have to re-parse & re-decode the salt and checksum each time.
+
+    malformed hashes aren't cached, and will raise an error every time.
+    """
+    if not isinstance(hash, unicode_or_bytes_types):
+        # let _parse_hash() issue the appropriate error
+        return handler._parse_hash(hash)
+    key = (handler, hash)
+    try:
+        return _parse_cache[key]
+    except KeyError:
+        pass
+    result = handler._parse_hash(hash)
+    if len(_parse_cache) >= _PARSE_CACHE_SIZE:
+        _parse_cache.clear()
+    _parse_cache[key] = result
+    return result
+
+class _Utf8SecretMixin(object):
+    """mixin shared by the pbkdf2 handlers -- provides a _norm_secret()
+    which encodes unicode secrets to utf-8 bytes (once per call,
+    instead of in every _calc_checksum() implementation).
+    """
+    @classmethod
+    def _norm_secret(cls, secret):
+        secret = super(_Utf8SecretMixin, cls)._norm_secret(secret)
+        if isinstance(secret, unicode):
+            secret = secret.encode("utf-8")
+        return secret
+
+def _pbkdf2_hmac(digest, secret, salt, rounds, keylen):
+    """_calc_checksum() helper -- same as :func:`~passlib.utils.pbkdf2.pbkdf2_hmac`,
+    but calls the C backend (if any) directly, skipping argument validation
+    (secret, salt & rounds have already been validated by the handler).
+    """
+    backend = _get_pbkdf2_hmac_backend(digest)
+    if backend:
+        return backend(digest, secret, salt, rounds, keylen)
+    return pbkdf2_hmac(digest, secret, salt, rounds, keylen)
+
+# grub_pbkdf2_sha512 hex helpers --
+# unhexlify() accepts ascii str under py33+, saving an encode() step
+# (note that bytes.fromhex() isn't used here, since it permits whitespace);
+# and bytes.hex() (py35+) avoids the intermediate hexlify() result.
+if sys.version_info >= (3,3):
+    _decode_hex = unhexlify
+else:
+    def _decode_hex(source):
+        return unhexlify(source.encode("ascii"))
+
+if hasattr(bytes, "hex"):
+    def _encode_upper_hex(source):
+        return source.hex().upper()
+else:
+    def _encode_upper_hex(source):
+        return hexlify(source).decode("ascii").upper()
+
 #=============================================================================
 #
 #=============================================================================
-class Pbkdf2DigestHandler(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
+class Pbkdf2DigestHandler(_Utf8SecretMixin, uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
     """base class for various pbkdf2_{digest} algorithms"""
     #===================================================================
     # class attrs
@@ -48,6 +121,42 @@ class Pbkdf2DigestHandler(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.Gen
 
     #--this class--
     _prf = None # subclass specified prf identifier
+    _digest = None # subclass specified hashlib digest name (used by _calc_checksum)
+
+    # docstring template used by create_pbkdf2_hash() subclasses (see _LazyDoc)
+    _doc_template = """This class implements a generic ``PBKDF2-%(prf)s``-based password hash, and follows the :ref:`password-hash-api`.
+
+    It supports a variable-length salt, and a variable number of rounds.
+
+    The :meth:`~passlib.ifc.PasswordHash.encrypt` and :meth:`~passlib.ifc.PasswordHash.genconfig` methods accept the following optional keywords:
+
+    :type salt: bytes
+    :param salt:
+        Optional salt bytes.
+        If specified, the length must be between 0-1024 bytes.
+        If not specified, a %(dsc)d byte salt will be autogenerated (this is recommended).
+
+    :type salt_size: int
+    :param salt_size:
+        Optional number of bytes to use when autogenerating new salts.
+        Defaults to 16 bytes, but can be any value between 0 and 1024.
+
+    :type rounds: int
+    :param rounds:
+        Optional number of rounds to use.
+        Defaults to %(dr)d, but must be within ``range(1,1<<32)``.
+
+    :type relaxed: bool
+    :param relaxed:
+        By default, providing an invalid value for one of the other
+        keywords will result in a :exc:`ValueError`. If ``relaxed=True``,
+        and the error can be corrected, a :exc:`~passlib.exc.PasslibHashWarning`
+        will be issued instead. Correctable errors include ``rounds``
+        that are too small or too large, and ``salt`` strings that are too long.
+
+        .. versionadded:: 1.6
+    """
+    _doc_params = None # subclass specified dict of parameters for _doc_template
 
     # NOTE: max_salt_size and max_rounds are arbitrarily chosen to provide sanity check.
     #       the underlying pbkdf2 specifies no bounds for either.
@@ -62,11 +171,17 @@ class Pbkdf2DigestHandler(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.Gen
 
     @classmethod
     def from_string(cls, hash):
+        rounds, salt, chk = _parse_cached(cls, hash)
+        return cls(rounds=rounds, salt=salt, checksum=chk)
+
+    @classmethod
+    def _parse_hash(cls, hash):
         rounds, salt, chk = uh.parse_mc3(hash, cls.ident, handler=cls)
         salt = ab64_decode(salt.encode("ascii"))
         if chk:
-            chk = ab64_decode(chk.encode("ascii"))
-        return cls(rounds=rounds, salt=salt, checksum=chk)
+            # NOTE: using constant-time decoder for the checksum
+            chk = b64ct.ab64_decode(chk.encode("ascii"))
+        return rounds, salt, chk
 
     def to_string(self, withchk=True):
         salt = ab64_encode(self.salt).decode("ascii")
@@ -76,10 +191,115 @@ class Pbkdf2DigestHandler(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.Gen
             chk = None
         return uh.render_mc3(self.ident, self.rounds, salt, chk)
 
+    # NOTE: _calc_checksum() is provided by create_pbkdf2_hash(),
+    #       via _create_calc_checksum().
+
+    @classmethod
+    def _releases_gil(cls):
+        """check if the active pbkdf2 backend releases the GIL
+        (hashlib & fastpbkdf2 both do), so the *_many() methods can use threads.
+        """
+        return bool(_get_pbkdf2_hmac_backend(cls._digest))
+
+    @classmethod
+    def verify_many(cls, pairs, max_workers=None):
+        """verify a batch of ``(secret, hash)`` pairs.
+
+        :arg pairs: iterable of ``(secret, hash)`` tuples.
+        :param max_workers: number of threads to use (defaults to the cpu count).
+        :returns: list of :meth:`verify` results, in the same order as *pairs*.
+
+        When a C pbkdf2 backend is in use (which releases the GIL),
+        the pairs will be verified in parallel using a thread pool.
+        Otherwise (or if :mod:`!concurrent.futures` isn't available)
+        they will be verified one at a time.
+
+        .. versionadded:: 1.7
+        """
+        verify = cls.verify
+        threaded = cls._releases_gil()
+        return list(_thread_map(lambda pair: verify(*pair), pairs,
+                                threaded, max_workers))
+
+    @classmethod
+    def encrypt_many(cls, secrets, max_workers=None, **kwds):
+        """encrypt a batch of passwords.
+
+        :arg secrets: iterable of passwords.
+        :param max_workers: number of threads to use (defaults to the cpu count).
+        :param \*\*kwds: settings passed through to :meth:`encrypt`.
+        :returns: list of hashes, in the same order as *secrets*.
+
+        Each password still gets its own random salt (sharing a single config
+        string would reuse the salt). As with :meth:`verify_many`, the passwords
+        are hashed in parallel when a C pbkdf2 backend is in use.
+
+        .. versionadded:: 1.7
+        """
+        encrypt = cls.encrypt
+        threaded = cls._releases_gil()
+        return list(_thread_map(lambda secret: encrypt(secret, **kwds), secrets,
+                                threaded, max_workers))
+
+    @classmethod
+    def crack_many(cls, hash, candidates, max_workers=None):
+        """check a batch of candidate passwords against a single hash.
+
+        :arg hash: the hash to check against.
+        :arg candidates: iterable of candidate passwords.
+        :param max_workers: number of threads to use (defaults to the cpu count).
+        :returns: the first candidate which matches the hash, or ``None``.
+
+        This is intended for password-audit tooling: the hash is only parsed once,
+        and (as with :meth:`verify_many`) the candidates are checked in parallel
+        when a C pbkdf2 backend is in use. It should *not* be used to authenticate
+        users, use :meth:`verify` for that.
+
+        .. versionadded:: 1.7
+        """
+        self = cls.from_string(hash)
+        chk = self.checksum
+        if chk is None:
+            raise uh.exc.MissingDigestError(cls)
+        norm_secret = cls._norm_secret
+        calc_checksum = self._calc_checksum
+        def check(secret):
+            return secret, consteq(calc_checksum(norm_secret(secret)), chk)
+
+        threaded = cls._releases_gil()
+        for secret, matched in _thread_map(check, candidates, threaded, max_workers):
+            if matched:
+                return secret
+        return None
+
+class _LazyDoc(object):
+    """create_pbkdf2_hash() helper -- descriptor which renders a class's
+    ``__doc__`` from its ``_doc_template`` & ``_doc_params`` when first accessed,
+    instead of formatting it for every class when the module is imported.
+    """
+    _doc = None # rendered docstring, cached after first access
+
+    def __get__(self, obj, cls):
+        doc = self._doc
+        if doc is None:
+            if cls is None:
+                cls = type(obj)
+            doc = self._doc = cls._doc_template % cls._doc_params
+        return doc
+
+def _create_calc_checksum(digest, checksum_size, rounds=None):
+    """helper for create_pbkdf2_hash() & the other pbkdf2-based handlers --
+    returns _calc_checksum() implementation which calls :func:`_pbkdf2_hmac`
+    with the digest name & checksum size bound as constants.
+
+    if *rounds* is specified, it's used in place of ``self.rounds``
+    (for hashes which use a fixed number of rounds).
+    """
     def _calc_checksum(self, secret):
-        if isinstance(secret, unicode):
-            secret = secret.encode("utf-8")
-        return pbkdf2(secret, self.salt, self.rounds, self.checksum_size, self._prf)
+        return _pbkdf2_hmac(digest, secret, self.salt,
+                            self.rounds if rounds is None else rounds,
+                            checksum_size)
+    return _calc_checksum
 
 def create_pbkdf2_hash(hash_name, digest_size, rounds=12000, ident=None, module=__name__):
     """create new Pbkdf2DigestHandler subclass for a specific hash"""
@@ -93,41 +313,13 @@ def create_pbkdf2_hash(hash_name, digest_size, rounds=12000, ident=None, module=
         name=name,
         ident=ident,
         _prf = prf,
+        _digest = hash_name,
+        _calc_checksum = _create_calc_checksum(hash_name, digest_size),
         default_rounds=rounds,
         checksum_size=digest_size,
         encoded_checksum_size=(digest_size*4+2)//3,
-        __doc__="""This class implements a generic ``PBKDF2-%(prf)s``-based password hash, and follows the :ref:`password-hash-api`.
-
-    It supports a variable-length salt, and a variable number of rounds.
-
-    The :meth:`~passlib.ifc.PasswordHash.encrypt` and :meth:`~passlib.ifc.PasswordHash.genconfig` methods accept the following optional keywords:
-
-    :type salt: bytes
-    :param salt:
-        Optional salt bytes.
-        If specified, the length must be between 0-1024 bytes.
-        If not specified, a %(dsc)d byte salt will be autogenerated (this is recommended).
-
-    :type salt_size: int
-    :param salt_size:
-        Optional number of bytes to use when autogenerating new salts.
-        Defaults to 16 bytes, but can be any value between 0 and 1024.
-
-    :type rounds: int
-    :param rounds:
-        Optional number of rounds to use.
-        Defaults to %(dr)d, but must be within ``range(1,1<<32)``.
-
-    :type relaxed: bool
-    :param relaxed:
-        By default, providing an invalid value for one of the other
-        keywords will result in a :exc:`ValueError`. If ``relaxed=True``,
-        and the error can be corrected, a :exc:`~passlib.exc.PasslibHashWarning`
-        will be issued instead. Correctable errors include ``rounds``
-        that are too small or too large, and ``salt`` strings that are too long.
-
-        .. versionadded:: 1.6
-    """ % dict(prf=prf.upper(), dsc=base.default_salt_size, dr=rounds)
+        _doc_params=dict(prf=prf.upper(), dsc=base.default_salt_size, dr=rounds),
+        __doc__=_LazyDoc(),
     ))
 
 #------------------------------------------------------------------------
@@ -146,9 +338,9 @@ ldap_pbkdf2_sha512 = uh.PrefixWrapper("ldap_pbkdf2_sha512", pbkdf2_sha512, "{PBK
 #=============================================================================
 
 # bytes used by cta hash for base64 values 63 & 64
-CTA_ALTCHARS = b"-_"
+CTA_ALTCHARS = b"-_" # NOTE: same as urlsafe base64 alphabet
 
-class cta_pbkdf2_sha1(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
+class cta_pbkdf2_sha1(_Utf8SecretMixin, uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
     """This class implements Cryptacular's PBKDF2-based crypt algorithm, and follows the :ref:`password-hash-api`.
 
     It supports a variable-length salt, and a variable number of rounds.
@@ -218,17 +410,22 @@ class cta_pbkdf2_sha1(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.Generic
 
     @classmethod
     def from_string(cls, hash):
+        rounds, salt, chk = _parse_cached(cls, hash)
+        return cls(rounds=rounds, salt=salt, checksum=chk)
+
+    @classmethod
+    def _parse_hash(cls, hash):
         # NOTE: passlib deviation - forbidding zero-padded rounds
         rounds, salt, chk = uh.parse_mc3(hash, cls.ident, rounds_base=16, handler=cls)
-        salt = b64decode(salt.encode("ascii"), CTA_ALTCHARS)
+        salt = urlsafe_b64decode(salt.encode("ascii"))
         if chk:
-            chk = b64decode(chk.encode("ascii"), CTA_ALTCHARS)
-        return cls(rounds=rounds, salt=salt, checksum=chk)
+            chk = b64ct.b64decode(chk.encode("ascii"), CTA_ALTCHARS)
+        return rounds, salt, chk
 
     def to_string(self, withchk=True):
-        salt = b64encode(self.salt, CTA_ALTCHARS).decode("ascii")
+        salt = urlsafe_b64encode(self.salt).decode("ascii")
         if withchk and self.checksum:
-            chk = b64encode(self.checksum, CTA_ALTCHARS).decode("ascii")
+            chk = urlsafe_b64encode(self.checksum).decode("ascii")
         else:
             chk = None
         return uh.render_mc3(self.ident, self.rounds, salt, chk, rounds_base=16)
@@ -236,10 +433,7 @@ class cta_pbkdf2_sha1(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.Generic
     #===================================================================
     # backend
     #===================================================================
-    def _calc_checksum(self, secret):
-        if isinstance(secret, unicode):
-            secret = secret.encode("utf-8")
-        return pbkdf2(secret, self.salt, self.rounds, 20, "hmac-sha1")
+    _calc_checksum = _create_calc_checksum("sha1", 20)
 
     #===================================================================
     # eoc
@@ -248,7 +442,7 @@ class cta_pbkdf2_sha1(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.Generic
 #=============================================================================
 # dlitz's pbkdf2 hash
 #=============================================================================
-class dlitz_pbkdf2_sha1(uh.HasRounds, uh.HasSalt, uh.GenericHandler):
+class dlitz_pbkdf2_sha1(_Utf8SecretMixin, uh.HasRounds, uh.HasSalt, uh.GenericHandler):
     """This class implements Dwayne Litzenberger's PBKDF2-based crypt algorithm, and follows the :ref:`password-hash-api`.
 
     It supports a variable-length salt, and a variable number of rounds.
@@ -321,10 +515,14 @@ class dlitz_pbkdf2_sha1(uh.HasRounds, uh.HasSalt, uh.GenericHandler):
 
     @classmethod
     def from_string(cls, hash):
-        rounds, salt, chk = uh.parse_mc3(hash, cls.ident, rounds_base=16,
-                                         default_rounds=400, handler=cls)
+        rounds, salt, chk = _parse_cached(cls, hash)
         return cls(rounds=rounds, salt=salt, checksum=chk)
 
+    @classmethod
+    def _parse_hash(cls, hash):
+        return uh.parse_mc3(hash, cls.ident, rounds_base=16,
+                            default_rounds=400, handler=cls)
+
     def to_string(self, withchk=True):
         rounds = self.rounds
         if rounds == 400:
@@ -337,10 +535,8 @@ class dlitz_pbkdf2_sha1(uh.HasRounds, uh.HasSalt, uh.GenericHandler):
     # backend
     #===================================================================
     def _calc_checksum(self, secret):
-        if isinstance(secret, unicode):
-            secret = secret.encode("utf-8")
         salt = str_to_bascii(self.to_string(withchk=False))
-        result = pbkdf2(secret, salt, self.rounds, 24, "hmac-sha1")
+        result = _pbkdf2_hmac("sha1", secret, salt, self.rounds, 24)
         return ab64_encode(result).decode("ascii")
 
     #===================================================================
@@ -350,7 +546,7 @@ class dlitz_pbkdf2_sha1(uh.HasRounds, uh.HasSalt, uh.GenericHandler):
 #=============================================================================
 # crowd
 #=============================================================================
-class atlassian_pbkdf2_sha1(uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
+class atlassian_pbkdf2_sha1(_Utf8SecretMixin, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
     """This class implements the PBKDF2 hash used by Atlassian.
 
     It supports a fixed-length salt, and a fixed number of rounds.
@@ -377,6 +573,7 @@ class atlassian_pbkdf2_sha1(uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler)
     name = "atlassian_pbkdf2_sha1"
     setting_kwds =("salt",)
     ident = u("{PKCS5S2}")
+    _ident_bytes = b"{PKCS5S2}"
     checksum_size = 32
 
     _stub_checksum = b"\x00" * 32
@@ -386,30 +583,43 @@ class atlassian_pbkdf2_sha1(uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler)
 
     @classmethod
     def from_string(cls, hash):
-        hash = to_unicode(hash, "ascii", "hash")
-        ident = cls.ident
+        salt, chk = _parse_cached(cls, hash)
+        return cls(salt=salt, checksum=chk)
+
+    @classmethod
+    def _parse_hash(cls, hash):
+        # NOTE: bytes are parsed as-is, skipping the round trip through unicode
+        #       (b64decode() will reject any non-ascii bytes anyway)
+        if isinstance(hash, bytes):
+            ident = cls._ident_bytes
+        else:
+            hash = to_unicode(hash, "ascii", "hash")
+            ident = cls.ident
         if not hash.startswith(ident):
             raise uh.exc.InvalidHashError(cls)
-        data = b64decode(hash[len(ident):].encode("ascii"))
-        salt, chk = data[:16], data[16:]
-        return cls(salt=salt, checksum=chk)
+        data = hash[len(ident):]
+        if not isinstance(data, bytes):
+            data = data.encode("ascii")
+        # NOTE: salt & checksum are encoded together, and the boundary between
+        #       them falls mid-block, so the whole thing uses the constant-time decoder.
+        data = b64ct.b64decode(data)
+        return data[:16], data[16:]
 
     def to_string(self):
         data = self.salt + (self.checksum or self._stub_checksum)
         hash = self.ident + b64encode(data).decode("ascii")
         return uascii_to_str(hash)
 
-    def _calc_checksum(self, secret):
-        # TODO: find out what crowd's policy is re: unicode
-        if isinstance(secret, unicode):
-            secret = secret.encode("utf-8")
-        # crowd seems to use a fixed number of rounds.
-        return pbkdf2(secret, self.salt, 10000, 32, "hmac-sha1")
+    # TODO: find out what crowd's policy is re: unicode
+    #       (_Utf8SecretMixin currently encodes it as utf-8)
+
+    # crowd seems to use a fixed number of rounds.
+    _calc_checksum = _create_calc_checksum("sha1", 32, rounds=10000)
 
 #=============================================================================
 # grub
 #=============================================================================
-class grub_pbkdf2_sha512(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
+class grub_pbkdf2_sha512(_Utf8SecretMixin, uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
     """This class implements Grub's pbkdf2-hmac-sha512 hash, and follows the :ref:`password-hash-api`.
 
     It supports a variable-length salt, and a variable number of rounds.
@@ -462,26 +672,33 @@ class grub_pbkdf2_sha512(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.Gene
 
     @classmethod
     def from_string(cls, hash):
+        rounds, salt, chk = _parse_cached(cls, hash)
+        return cls(rounds=rounds, salt=salt, checksum=chk)
+
+    @classmethod
+    def _parse_hash(cls, hash):
         rounds, salt, chk = uh.parse_mc3(hash, cls.ident, sep=u("."),
                                          handler=cls)
-        salt = unhexlify(salt.encode("ascii"))
-        if chk:
-            chk = unhexlify(chk.encode("ascii"))
-        return cls(rounds=rounds, salt=salt, checksum=chk)
+        try:
+            salt = _decode_hex(salt)
+            if chk:
+                chk = _decode_hex(chk)
+        except (TypeError, _BinasciiError):
+            # NOTE: py2's unhexlify() raises TypeError for odd-length / non-hex input
+            raise uh.exc.MalformedHashError(cls, "invalid hex data")
+        return rounds, salt, chk
 
     def to_string(self, withchk=True):
-        salt = hexlify(self.salt).decode("ascii").upper()
+        salt = _encode_upper_hex(self.salt)
         if withchk and self.checksum:
-            chk = hexlify(self.checksum).decode("ascii").upper()
+            chk = _encode_upper_hex(self.checksum)
         else:
             chk = None
         return uh.render_mc3(self.ident, self.rounds, salt, chk, sep=u("."))
 
-    def _calc_checksum(self, secret):
-        # TODO: find out what grub's policy is re: unicode
-        if isinstance(secret, unicode):
-            secret = secret.encode("utf-8")
-        return pbkdf2(secret, self.salt, self.rounds, 64, "hmac-sha512")
+    # TODO: find out what grub's policy is re: unicode
+    #       (_Utf8SecretMixin currently encodes it as utf-8)
+    _calc_checksum = _create_calc_checksum("sha512", 64)
 
 #=============================================================================
 # eof
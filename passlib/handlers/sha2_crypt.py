@@ -217,22 +217,30 @@ def _raw_sha2_crypt(pwd, salt, rounds, use_512=False):
 
     # build up list of even-round & odd-round constants,
     # and store in 21-element list as (even,odd) pairs.
-    data = [ (perms[even], perms[odd]) for even, odd in _c_digest_offsets]
+    # since odd rounds start with their constant, a hash context pre-loaded
+    # with it is stored instead, and copied each round (rather than hashing
+    # the constant all over again); which is ~3-10% faster, depending on pwd_len.
+    data = [ (perms[even], hash_const(perms[odd]).copy)
+             for even, odd in _c_digest_offsets]
 
     # perform as many full 42-round blocks as possible
     dc = da
     blocks, tail = divmod(rounds, 42)
     while blocks:
-        for even, odd in data:
-            dc = hash_const(odd + hash_const(dc + even).digest()).digest()
+        for even, odd_copy in data:
+            ctx = odd_copy()
+            ctx.update(hash_const(dc + even).digest())
+            dc = ctx.digest()
         blocks -= 1
 
     # perform any leftover rounds
     if tail:
         # perform any pairs of rounds
         pairs = tail>>1
-        for even, odd in data[:pairs]:
-            dc = hash_const(odd + hash_const(dc + even).digest()).digest()
+        for even, odd_copy in data[:pairs]:
+            ctx = odd_copy()
+            ctx.update(hash_const(dc + even).digest())
+            dc = ctx.digest()
 
         # if rounds was odd, do one last round (since we started at 0,
         # last round will be an even-numbered round)
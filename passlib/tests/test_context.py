@@ -20,7 +20,8 @@ from passlib.exc import PasslibConfigWarning
 from passlib.utils import tick, to_unicode
 from passlib.utils.compat import irange, u, unicode, str_to_uascii, PY2, PY26
 import passlib.utils.handlers as uh
-from passlib.tests.utils import TestCase, set_file, TICK_RESOLUTION, quicksleep
+from passlib.tests.utils import TestCase, set_file, TICK_RESOLUTION, quicksleep, \
+                                 patchAttr
 from passlib.registry import (register_crypt_handler_path,
                         _has_crypt_handler as has_crypt_handler,
                         _unload_handler_name as unload_handler_name,
@@ -1017,6 +1018,17 @@ sha512_crypt__min_rounds = 45000
         self.assertEqual(cc.identify('$9$232323123$1287319827'), None)
         self.assertRaises(ValueError, cc.identify, '$9$232323123$1287319827', required=True)
 
+        # check schemes which all have an ident prefix (uses regex search)
+        cc = CryptContext(["sha256_crypt", "bcrypt", "pbkdf2_sha1", "pbkdf2_sha256"])
+        self.assertEqual(cc.identify('$5$rounds=1000$salt$chk'), "sha256_crypt")
+        self.assertEqual(cc.identify(b'$2y$05$salt'), "bcrypt")
+        self.assertEqual(cc.identify('$pbkdf2$1000$salt$chk'), "pbkdf2_sha1")
+        self.assertEqual(cc.identify('$pbkdf2-sha256$1000$salt$chk'), "pbkdf2_sha256")
+        self.assertEqual(cc.identify('$1$salt$chk'), None)
+        self.assertEqual(cc.identify(''), None)
+        for hash, kwds in self.nonstring_vectors:
+            self.assertRaises(TypeError, cc.identify, hash, **kwds)
+
         #--------------------------------------------------------------
         # border cases
         #--------------------------------------------------------------
@@ -1220,6 +1232,40 @@ sha512_crypt__min_rounds = 45000
     # the min/max/default/vary_rounds options, via the output of
     # genconfig(). it's assumed encrypt() takes the same codepath.
 
+    def test_48_verify_many(self):
+        """test verify_many()"""
+        cc = CryptContext(["md5_crypt", "des_crypt"])
+        h1 = hash.md5_crypt.encrypt("test")
+        h2 = hash.des_crypt.encrypt("other")
+        pairs = [("test", h1), ("other", h2), ("other", h1), ("test", h2)]
+        expected = [True, True, False, False]
+        self.assertEqual(cc.verify_many(pairs), expected)
+        self.assertEqual(cc.verify_many(iter(pairs), max_workers=2), expected)
+        self.assertEqual(cc.verify_many([]), [])
+        self.assertEqual(cc.verify_many([("test", h1), ("x", h1)],
+                                        scheme="md5_crypt"), [True, False])
+        self.assertRaises(ValueError, cc.verify_many, [("test", h1)],
+                          scheme="des_crypt")
+        self.assertRaises(ValueError, cc.verify_many,
+                          [("test", h1), ("test", "$6$abc")], max_workers=2)
+
+        # threads should only be used if every backend releases the GIL
+        import passlib.context as mod
+        from passlib.utils.pbkdf2 import _get_pbkdf2_hmac_backend
+        calls = []
+        orig = mod._thread_map
+        def wrapper(func, items, threaded=True, max_workers=None):
+            calls.append(threaded)
+            return orig(func, items, threaded, max_workers)
+        patchAttr(self, mod, "_thread_map", wrapper)
+        self.assertEqual(cc.verify_many(pairs, max_workers=2), expected)
+        cc2 = CryptContext(["pbkdf2_sha256", "md5_crypt"])
+        h3 = hash.pbkdf2_sha256.encrypt("test", rounds=1000)
+        self.assertEqual(cc2.verify_many([("test", h3), ("x", h3)]), [True, False])
+        self.assertEqual(cc2.verify_many([("test", h3), ("test", h1)]), [True, True])
+        c_backend = bool(_get_pbkdf2_hmac_backend("sha256"))
+        self.assertEqual(calls, [False, c_backend, False])
+
     def test_50_rounds_limits(self):
         """test rounds limits"""
         cc = CryptContext(schemes=["sha256_crypt"],
@@ -14,7 +14,8 @@ from passlib import hash
 from passlib.utils import repeat_string
 from passlib.utils.compat import irange, PY3, u, get_method_function
 from passlib.tests.utils import TestCase, HandlerCase, skipUnless, \
-        TEST_MODE, UserHandlerMixin, randintgauss, EncodingHandlerMixin
+        TEST_MODE, UserHandlerMixin, randintgauss, EncodingHandlerMixin, \
+        patchAttr
 # module
 
 #=============================================================================
@@ -1329,6 +1330,95 @@ class pbkdf2_sha1_test(HandlerCase):
         '$pbkdf2$1212$THDqatpidANpadlLeTeOEg$HV3oi1k5C5LQCgG1BMOL.BX4YZc$',
     ]
 
+    def test_90_parse_cache(self):
+        """test from_string() parse cache"""
+        from passlib.handlers import pbkdf2 as mod
+        handler = self.handler
+        secret, hash = self.known_correct_hashes[0]
+        mod._parse_cache.clear()
+        self.addCleanup(mod._parse_cache.clear)
+
+        # cached result should be reused, but still produce distinct instances
+        a = handler.from_string(hash)
+        self.assertIn((handler, hash), mod._parse_cache)
+        b = handler.from_string(hash)
+        self.assertIsNot(a, b)
+        self.assertEqual((a.rounds, a.salt, a.checksum),
+                         (b.rounds, b.salt, b.checksum))
+        self.assertTrue(handler.verify(secret, hash))
+
+        # malformed hashes shouldn't be cached
+        bad = self.known_malformed_hashes[0]
+        self.assertRaises(ValueError, handler.from_string, bad)
+        self.assertNotIn((handler, bad), mod._parse_cache)
+        self.assertRaises(ValueError, handler.from_string, bad)
+
+        # cache should be reset once it grows too large
+        patchAttr(self, mod, "_PARSE_CACHE_SIZE", 1)
+        handler.from_string(self.known_correct_hashes[1][1])
+        self.assertEqual(len(mod._parse_cache), 1)
+
+    def test_91_verify_many(self):
+        """test verify_many()"""
+        handler = self.handler
+        (s1, h1), (s2, h2) = self.known_correct_hashes
+        pairs = [(s1, h1), (s2, h2), (s2, h1), (s1, h2), (s1, h1)]
+        expected = [True, True, False, False, True]
+        self.assertEqual(handler.verify_many(pairs), expected)
+        self.assertEqual(handler.verify_many(iter(pairs), max_workers=2), expected)
+        self.assertEqual(handler.verify_many([]), [])
+
+    def test_92_crack_many(self):
+        """test crack_many()"""
+        handler = self.handler
+        (s1, h1), (s2, h2) = self.known_correct_hashes
+        self.assertEqual(handler.crack_many(h1, ["a", "b", s1, s2]), s1)
+        self.assertEqual(handler.crack_many(h2, iter([s1, s2]), max_workers=2), s2)
+        self.assertIs(handler.crack_many(h1, ["a", "b"]), None)
+        self.assertIs(handler.crack_many(h1, []), None)
+        self.assertRaises(TypeError, handler.crack_many, h1, [None])
+
+    def test_93_lazy_doc(self):
+        """test generated class docstring"""
+        from passlib.handlers.pbkdf2 import _LazyDoc
+        handler = self.handler
+        self.assertIsInstance(handler.__dict__["__doc__"], _LazyDoc)
+        doc = handler.__doc__
+        self.assertIn("``PBKDF2-HMAC-SHA1``", doc)
+        self.assertIn("Defaults to %d," % handler.default_rounds, doc)
+        self.assertIs(handler.__doc__, doc)
+        self.assertEqual(handler(use_defaults=True).__doc__, doc)
+
+    def test_94_encrypt_many(self):
+        """test encrypt_many()"""
+        handler = self.handler
+        secrets = ["a", "b", "a", UPASS_WAV]
+        hashes = handler.encrypt_many(secrets, rounds=1000)
+        self.assertEqual(len(hashes), 4)
+        for secret, hash in zip(secrets, hashes):
+            self.assertTrue(handler.verify(secret, hash))
+            self.assertEqual(handler.from_string(hash).rounds, 1000)
+        self.assertNotEqual(hashes[0], hashes[2]) # salts should differ
+        self.assertEqual(handler.encrypt_many([]), [])
+        self.assertRaises(TypeError, handler.encrypt_many, ["a", None])
+
+    def test_95_many_serial_fallback(self):
+        """test *_many() methods without a thread pool"""
+        import passlib.utils as utils_mod
+        handler = self.handler
+        (s1, h1), (s2, h2) = self.known_correct_hashes
+        patchAttr(self, utils_mod, "ThreadPoolExecutor", None)
+        for method, args, expected in [
+                ("verify_many", ([(s1, h1), (s1, h2)],), [True, False]),
+                # candidates should be consumed lazily, stopping at first match
+                ("crack_many", (h1, iter(["a", s1, None])), s1),
+                ("crack_many", (h1, ["a", "b"]), None),
+                ]:
+            result = getattr(handler, method)(*args, max_workers=2)
+            self.assertEqual(result, expected, method)
+        hashes = handler.encrypt_many(iter(["a", "b"]), max_workers=2)
+        self.assertTrue(handler.verify("b", hashes[1]))
+
 class pbkdf2_sha256_test(HandlerCase):
     handler = hash.pbkdf2_sha256
     known_correct_hashes = [
@@ -1340,6 +1430,15 @@ class pbkdf2_sha256_test(HandlerCase):
             ),
     ]
 
+    known_malformed_hashes = [
+        # standard base64 '+' instead of ab64 '.' in checksum
+        # (accepted by passlib < 1.7)        ---\/
+        '$pbkdf2-sha256$1212$4vjV83LKPjQzk31VI4E0Vw$hsYF68OiOUPdDZ1Fg+fJPeq1h/gXXY7acBp9/6c.tmQ',
+
+        # trailing padding on checksum (accepted by passlib < 1.7)
+        '$pbkdf2-sha256$1212$4vjV83LKPjQzk31VI4E0Vw$hsYF68OiOUPdDZ1Fg.fJPeq1h/gXXY7acBp9/6c.tmQ=',
+    ]
+
 class pbkdf2_sha512_test(HandlerCase):
     handler = hash.pbkdf2_sha512
     known_correct_hashes = [
@@ -1369,6 +1468,12 @@ class cta_pbkdf2_sha1_test(HandlerCase):
             "$p5k2$4321$OTg3NjU0MzIx$jINJrSvZ3LXeIbUdrJkRpN62_WQ="),
         ]
 
+    known_malformed_hashes = [
+        # trailing chars after padded checksum (ignored by passlib < 1.7)
+        "$p5k2$1$$h1TDLGSw9ST8UMAPeIE13i0t12c=A",
+        "$p5k2$1$$h1TDLGSw9ST8UMAPeIE13i0t12c===",
+        ]
+
 class dlitz_pbkdf2_sha1_test(HandlerCase):
     handler = hash.dlitz_pbkdf2_sha1
     known_correct_hashes = [
@@ -1409,6 +1514,46 @@ class grub_pbkdf2_sha512_test(HandlerCase):
 
         ]
 
+    known_alternate_hashes = [
+        # lower case hex should be accepted, and rendered back as upper case
+        ('grub.pbkdf2.sha512.10000.9b436bb6978682363d5c449b'
+            'beab322676946c632208bc1294d51f47174a9a3b04a7e4785'
+            '986cd4ea7470fab8fe9f6bd522d1fc6c51109a8596fb7ad48'
+            '7c4493.0fe5ef169affcb67d86e2581b1e251d88c777b98ba'
+            '2d3256ecc9f765d84956fc5ca5c4b6fd711aa285f0a04dcf4'
+            '634083f9a20f4b6f339a52fbd6bed618e527b',
+         'toomanysecrets',
+         'grub.pbkdf2.sha512.10000.9B436BB6978682363D5C449B'
+            'BEAB322676946C632208BC1294D51F47174A9A3B04A7E4785'
+            '986CD4EA7470FAB8FE9F6BD522D1FC6C51109A8596FB7AD48'
+            '7C4493.0FE5EF169AFFCB67D86E2581B1E251D88C777B98BA'
+            '2D3256ECC9F765D84956FC5CA5C4B6FD711AA285F0A04DCF4'
+            '634083F9A20F4B6F339A52FBD6BED618E527B'),
+    ]
+
+    known_malformed_hashes = [
+        # whitespace in salt (accepted by bytes.fromhex, so make sure it's rejected)
+        'grub.pbkdf2.sha512.10000.BCAC 1CEC5E4341C8C511C529'
+        '7FA877BE91C2817B32A35A3ECF5CA6B8B257F751.6968526A'
+        '2A5B1AEEE0A29A9E057336B48D388FFB3F600233237223C21'
+        '04DE1752CEC35B0DD1ED49563398A282C0F471099C2803FBA'
+        '47C7919CABC43192C68F60',
+
+        # non-hex char in checksum
+        'grub.pbkdf2.sha512.10000.BCAC1CEC5E4341C8C511C529'
+        '7FA877BE91C2817B32A35A3ECF5CA6B8B257F751.6968526A'
+        '2A5B1AEEE0A29A9E057336B48D388FFB3F600233237223C21'
+        '04DE1752CEC35B0DD1ED49563398A282C0F471099C2803FBA'
+        '47C7919CABC43192C68F6G',
+
+        # odd number of hex digits in salt
+        'grub.pbkdf2.sha512.10000.BCAC1CEC5E4341C8C511C529'
+        '7FA877BE91C2817B32A35A3ECF5CA6B8B257F75.6968526A'
+        '2A5B1AEEE0A29A9E057336B48D388FFB3F600233237223C21'
+        '04DE1752CEC35B0DD1ED49563398A282C0F471099C2803FBA'
+        '47C7919CABC43192C68F60',
+    ]
+
 #=============================================================================
 # PHPass Portable Crypt
 #=============================================================================
@@ -9,7 +9,7 @@ import random
 # pkg
 # module
 from passlib.utils.compat import irange, PY3, u, unicode, join_bytes
-from passlib.tests.utils import TestCase
+from passlib.tests.utils import TestCase, patchAttr
 
 #=============================================================================
 # byte funcs
@@ -128,6 +128,20 @@ class MiscTest(TestCase):
         # NOTE: decoding this due to py3 bytes
         self.assertEqual(sorted(set(x.decode("ascii"))), [u('a'),u('b'),u('c')])
 
+        # charset sizes which divide 256 (uses translate() fast path)
+        x = f(u('abcd'), 32)
+        self.assertIsInstance(x, unicode)
+        self.assertEqual(len(x), 32)
+        self.assertEqual(sorted(set(x)), [u('a'),u('b'),u('c'),u('d')])
+        x = f(b'abcd', 32)
+        self.assertIsInstance(x, bytes)
+        self.assertEqual(sorted(set(x.decode("ascii"))), [u('a'),u('b'),u('c'),u('d')])
+        self.assertEqual(f(u('ab'), 0), u(''))
+
+        # non-ascii charset
+        x = f(u('\u00e0\u00e1'), 32)
+        self.assertEqual(sorted(set(x)), [u('\u00e0'),u('\u00e1')])
+
         # generate_password
         from passlib.utils import generate_password
         self.assertEqual(len(generate_password(15)), 15)
@@ -264,6 +278,17 @@ class MiscTest(TestCase):
             self.assertFalse(consteq(l, r), "values %r %r:" % (l,r))
             self.assertFalse(consteq(r, l), "values %r %r:" % (r,l))
 
+        # check pure-python fallback used for bytes when hmac.compare_digest() is missing
+        import passlib.utils as mod
+        if mod._compare_digest:
+            patchAttr(self, mod, "_compare_digest", None)
+            self.assertTrue(consteq(b"abc", b"abc"))
+            self.assertFalse(consteq(b"abc", b"abz"))
+            self.assertFalse(consteq(b"abc", b"abcdef"))
+            self.assertTrue(consteq(u("abc"), u("abc")))
+            self.assertFalse(consteq(u("abc"), u("abz")))
+            self.assertRaises(TypeError, consteq, b'', u(''))
+
         # TODO: add some tests to ensure we take THETA(strlen) time.
         # this might be hard to do reproducably.
         # NOTE: below code was used to generate stats for analysis
@@ -383,6 +408,55 @@ class MiscTest(TestCase):
         self.assertEqual(splitcomma(" a , b"), ['a', 'b'])
         self.assertEqual(splitcomma(" a, b, "), ['a', 'b'])
 
+    def test_thread_map(self):
+        """test _thread_map()"""
+        import passlib.utils as mod
+        from passlib.utils import _thread_map
+        def square(value):
+            return value * value
+
+        # check results are in order, both with & without a thread pool
+        for executor in [mod.ThreadPoolExecutor, None]:
+            patchAttr(self, mod, "ThreadPoolExecutor", executor)
+            for threaded in [True, False]:
+                for max_workers in [None, 1, 2]:
+                    self.assertEqual(list(_thread_map(square, iter(irange(5)),
+                                                      threaded, max_workers)),
+                                     [0, 1, 4, 9, 16])
+                self.assertEqual(list(_thread_map(square, [], threaded)), [])
+
+        # serial mode should consume items lazily
+        seen = []
+        def record(value):
+            seen.append(value)
+            return value
+        itr = _thread_map(record, iter(irange(5)), threaded=False)
+        self.assertEqual(next(itr), 0)
+        self.assertEqual(seen, [0])
+
+        # thread pool should only queue a bounded number of items,
+        # and cancel the rest when the caller stops early
+        if mod.ThreadPoolExecutor is None:
+            return
+        from itertools import count
+        pulled = []
+        def source():
+            for value in count():
+                pulled.append(value)
+                yield value
+        itr = _thread_map(square, source(), max_workers=2)
+        self.assertEqual([next(itr) for _ in irange(3)], [0, 1, 4])
+        itr.close()
+        limit = 2 * mod._THREAD_MAP_QUEUE_FACTOR + 3
+        self.assertLessEqual(len(pulled), limit)
+
+        # errors should propagate
+        def fail(value):
+            if value == 3:
+                raise ValueError("boom")
+            return value
+        self.assertRaises(ValueError, list, _thread_map(fail, irange(20), max_workers=2))
+
 #=============================================================================
 # byte/unicode helpers
 #=============================================================================
@@ -494,6 +568,8 @@ class CodecTest(TestCase):
         self.assertTrue(is_ascii_safe(u("\x00abc\x7f")))
         self.assertFalse(is_ascii_safe(b"\x00abc\x80"))
         self.assertFalse(is_ascii_safe(u("\x00abc\x80")))
+        self.assertFalse(is_ascii_safe(b"a\xffbc"))
+        self.assertFalse(is_ascii_safe(u("a\u1234bc")))
 
     def test_is_same_codec(self):
         """test is_same_codec()"""
@@ -538,6 +614,14 @@ class Base64EngineTest(TestCase):
         # 1 mod 4 not valid
         self.assertRaises(ValueError, ab64_decode, "abcde")
 
+    def test_ab64_encode(self):
+        from passlib.utils import ab64_encode
+        # uses "." instead of "+", omits padding
+        self.assertEqual(ab64_encode(b"\xfb\xff\xbf"), b"././")
+        self.assertEqual(ab64_encode(b"\xfb\xff"), b"./8")
+        self.assertEqual(ab64_encode(b"\xfb"), b".w")
+        self.assertEqual(ab64_encode(b""), b"")
+
 class _Base64Test(TestCase):
     """common tests for all Base64Engine instances"""
     #===================================================================
@@ -738,6 +822,11 @@ class _Base64Test(TestCase):
             out = engine.decode_bytes(tmp)
             self.assertEqual(out, result)
 
+        # short offset lists
+        self.assertEqual(engine.encode_transposed_bytes(b"\x11\x22", [1]),
+                         engine.encode_bytes(b"\x22"))
+        self.assertEqual(engine.encode_transposed_bytes(b"\x11\x22", []), b"")
+
         self.assertRaises(TypeError, engine.encode_transposed_bytes, u("a"), [])
 
     def test_decode_transposed_bytes(self):
@@ -904,6 +993,46 @@ class H64Big_Test(_Base64Test):
         (b"z.", 4032, 12),
     ]
 
+#=============================================================================
+# constant-time base64
+#=============================================================================
+class B64CTTest(TestCase):
+    """test passlib.utils.b64ct"""
+
+    def test_decode_block(self):
+        """test decode_block()"""
+        from passlib.utils.b64ct import decode_block
+        self.assertEqual(decode_block(b"QUJD"), b"ABC")
+        self.assertEqual(decode_block(b"-_-_", b"-_"), b"\xfb\xff\xbf")
+        self.assertRaises(ValueError, decode_block, b"QUJ")
+        self.assertRaises(ValueError, decode_block, b"QUJ$")
+
+    def test_b64decode(self):
+        """test b64decode() against stdlib"""
+        from base64 import b64encode
+        from passlib.utils import getrandbytes
+        from passlib.utils.b64ct import b64decode
+        for size in irange(0, 40):
+            data = getrandbytes(random, size)
+            self.assertEqual(b64decode(b64encode(data)), data)
+            self.assertEqual(b64decode(b64encode(data, b"-_"), b"-_"), data)
+
+        # invalid chars, padding, and sizes
+        self.assertRaises(ValueError, b64decode, b"QU$D")
+        self.assertRaises(ValueError, b64decode, b"QUJ")
+        self.assertRaises(ValueError, b64decode, b"Q===")
+        self.assertRaises(ValueError, b64decode, b"QU=D")
+
+    def test_ab64_decode(self):
+        """test ab64_decode() against utils.ab64_decode()"""
+        from passlib.utils import getrandbytes, ab64_encode, ab64_decode as ref_decode
+        from passlib.utils.b64ct import ab64_decode
+        for size in irange(0, 40):
+            encoded = ab64_encode(getrandbytes(random, size))
+            self.assertEqual(ab64_decode(encoded), ref_decode(encoded))
+        self.assertRaises(ValueError, ab64_decode, b"abcde")
+        self.assertRaises(ValueError, ab64_decode, b"ab+d")
+
 #=============================================================================
 # eof
 #=============================================================================
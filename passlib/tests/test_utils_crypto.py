@@ -6,12 +6,17 @@ from __future__ import with_statement
 # core
 from binascii import hexlify, unhexlify
 import hashlib
+import hmac
 import warnings
 # site
 try:
     import M2Crypto
 except ImportError:
     M2Crypto = None
+try:
+    import fastpbkdf2
+except ImportError:
+    fastpbkdf2 = None
 # pkg
 # module
 from passlib.utils.compat import bascii_to_str, PY3, u, JYTHON
@@ -628,24 +633,134 @@ class _Pbkdf2_Test(TestCase):
         result = pbkdf2(b'secret', b'salt', 1000, 20, prf)
         self.assertEqual(result, hb('5fe7ce9f7e379d3f65cbc66ba8aa6440474a6849'))
 
+    def test_pbkdf2_hmac(self):
+        """test pbkdf2_hmac() wrapper"""
+        from passlib.utils.pbkdf2 import pbkdf2_hmac
+        for row in self.pbkdf2_test_vectors:
+            correct, secret, salt, rounds, keylen = row[:5]
+            prf = row[5] if len(row) == 6 else "hmac-sha1"
+            if not isinstance(prf, str):
+                continue
+            result = pbkdf2_hmac(prf[5:], secret, salt, rounds, keylen)
+            self.assertEqual(result, correct)
+
 #------------------------------------------------------------------------
-# create subclasses to test with- and without- m2crypto
+# create subclasses to test with- and without- fastpbkdf2 / hashlib / m2crypto
 #------------------------------------------------------------------------
+has_stdlib_pbkdf2 = hasattr(hashlib, "pbkdf2_hmac")
+
+def _disable_pbkdf2_backends(test, *names):
+    """helper to temporarily disable pbkdf2 backends for duration of test"""
+    import passlib.utils.pbkdf2 as mod
+    for name in names:
+        test.addCleanup(setattr, mod, name, getattr(mod, name))
+        setattr(mod, name, None)
+
+@skipUnless(has_stdlib_pbkdf2, "hashlib lacks pbkdf2_hmac()")
+class Pbkdf2_Backend_Test(TestCase):
+    """test pbkdf2_hmac() backend selection"""
+    descriptionPrefix = "pbkdf2 backend selection"
+
+    def setUp(self):
+        super(Pbkdf2_Backend_Test, self).setUp()
+        from passlib.utils.pbkdf2 import _clear_caches
+        _clear_caches()
+        self.addCleanup(_clear_caches)
+
+    def test_backend_order(self):
+        """test fastpbkdf2 -> hashlib -> builtin fallback order"""
+        import passlib.utils.pbkdf2 as mod
+        from passlib.handlers.pbkdf2 import grub_pbkdf2_sha512
+        _disable_pbkdf2_backends(self, "_fast_pbkdf2_hmac", "_stdlib_pbkdf2_hmac")
+
+        # install fake fastpbkdf2 & hashlib backends which record their calls
+        calls = []
+        def fake_fast(digest, *args):
+            calls.append(("fast", digest))
+            return hashlib.pbkdf2_hmac(digest, *args)
+        def fake_stdlib(digest, *args):
+            calls.append(("stdlib", digest))
+            if digest == "md4":
+                raise ValueError("unsupported hash type")
+            return hashlib.pbkdf2_hmac(digest, *args)
+        mod._fast_pbkdf2_hmac = fake_fast
+        mod._stdlib_pbkdf2_hmac = fake_stdlib
+
+        # fastpbkdf2 should be preferred for the digests it supports
+        for digest in mod._fast_pbkdf2_digests:
+            self.assertIs(mod._get_pbkdf2_hmac_backend(digest), fake_fast)
+
+        # hashlib should be used for the rest, if it supports the digest
+        self.assertIs(mod._get_pbkdf2_hmac_backend("md5"), fake_stdlib)
+        self.assertIs(mod._get_pbkdf2_hmac_backend("md4"), None)
+
+        # handlers should pick up the preferred backend
+        del calls[:]
+        hash = grub_pbkdf2_sha512.encrypt("test", rounds=10)
+        self.assertEqual(calls, [("fast", "sha512")])
+        del calls[:]
+        self.assertTrue(grub_pbkdf2_sha512.verify("test", hash))
+        self.assertEqual(calls, [("fast", "sha512")])
+
+        # and fall back to builtin implementation w/o any C backends
+        mod._fast_pbkdf2_hmac = mod._stdlib_pbkdf2_hmac = None
+        mod._clear_caches()
+        self.assertIs(mod._get_pbkdf2_hmac_backend("sha512"), None)
+        del calls[:]
+        self.assertTrue(grub_pbkdf2_sha512.verify("test", hash))
+        self.assertEqual(calls, [])
+
+@skipUnless(fastpbkdf2, "fastpbkdf2 not found")
+class Pbkdf2_FastPbkdf2_Test(_Pbkdf2_Test):
+    descriptionPrefix = "pbkdf2 (fastpbkdf2 backend)"
+
+@skipUnless(has_stdlib_pbkdf2, "hashlib lacks pbkdf2_hmac()")
+class Pbkdf2_Stdlib_Test(_Pbkdf2_Test):
+    descriptionPrefix = "pbkdf2 (hashlib backend)"
+
+    def setUp(self):
+        super(Pbkdf2_Stdlib_Test, self).setUp()
+        _disable_pbkdf2_backends(self, "_fast_pbkdf2_hmac")
+
 @skipUnless(M2Crypto, "M2Crypto not found")
 class Pbkdf2_M2Crypto_Test(_Pbkdf2_Test):
     descriptionPrefix = "pbkdf2 (m2crypto backend)"
 
-@skipUnless(TEST_MODE("full") or not M2Crypto, "skipped under current test mode")
+    def setUp(self):
+        super(Pbkdf2_M2Crypto_Test, self).setUp()
+        _disable_pbkdf2_backends(self, "_fast_pbkdf2_hmac", "_stdlib_pbkdf2_hmac")
+
+# NOTE: unlike the md4 tests, this isn't limited to full test mode:
+#       the builtin pbkdf2 loop is always available as the fallback backend,
+#       and these vectors run quickly enough (since it still uses hashlib's hmac).
 class Pbkdf2_Builtin_Test(_Pbkdf2_Test):
     descriptionPrefix = "pbkdf2 (builtin backend)"
 
     def setUp(self):
         super(Pbkdf2_Builtin_Test, self).setUp()
-        # disable m2crypto support, and force pure-python backend
-        if M2Crypto:
-            import passlib.utils.pbkdf2 as mod
-            self.addCleanup(setattr, mod, "_EVP", mod._EVP)
-            mod._EVP = None
+        # disable all C backends, and force pure-python backend
+        _disable_pbkdf2_backends(self, "_fast_pbkdf2_hmac", "_stdlib_pbkdf2_hmac",
+                                 "_EVP")
+
+    def test_hmac_keyed_once(self):
+        """test builtin backend keys hmac once per call"""
+        # multi-block keys (e.g. dlitz_pbkdf2_sha1's 24 byte sha1 keys)
+        # should reuse the same inner & outer hmac contexts for every block.
+        import passlib.utils.pbkdf2 as mod
+        orig = mod._get_hmac_protos
+        calls = []
+        def wrapper(digest, key):
+            calls.append(digest)
+            return orig(digest, key)
+        self.addCleanup(setattr, mod, "_get_hmac_protos", orig)
+        mod._get_hmac_protos = wrapper
+        result = mod.pbkdf2_hmac("sha1", b"password", b"salt", 2, 60)
+        self.assertEqual(calls, ["sha1"])
+
+        # compare against generic prf codepath
+        def prf(key, msg):
+            return hmac.new(key, msg, hashlib.sha1).digest()
+        self.assertEqual(result, mod.pbkdf2(b"password", b"salt", 2, 60, prf))
 
 #=============================================================================
 # eof
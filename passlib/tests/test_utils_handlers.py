@@ -71,6 +71,8 @@ class SkeletonTest(TestCase):
         self.assertFalse(d1.identify(u('a')))
         self.assertFalse(d1.identify(u('b')))
         self.assertFalse(d1.identify(u('c')))
+        self.assertFalse(d1.identify(u('_')))
+        self.assertFalse(d1.identify(u('_aa')))
         self.assertRaises(TypeError, d1.identify, None)
         self.assertRaises(TypeError, d1.identify, 1)
 
@@ -229,6 +231,82 @@ class SkeletonTest(TestCase):
         # test _stub_checksum behavior
         self.assertIs(norm_checksum(b'0'*4), None)
 
+    def test_13_norm_secret(self):
+        """test GenericHandler._norm_secret() hook"""
+        class d1(uh.StaticHandler):
+            name = "d1"
+            _hash_prefix = u("_")
+
+            @classmethod
+            def _norm_secret(cls, secret):
+                secret = super(d1, cls)._norm_secret(secret)
+                if isinstance(secret, bytes):
+                    secret = secret.decode("ascii")
+                return secret.upper()
+
+            def _calc_checksum(self, secret):
+                return secret
+
+        # secret should be normalized before reaching _calc_checksum()
+        self.assertEqual(d1.encrypt(u("abc")), u("_ABC"))
+        self.assertEqual(d1.encrypt(b"abc"), u("_ABC"))
+        self.assertEqual(d1.genhash(u("abc"), None), u("_ABC"))
+        self.assertTrue(d1.verify(u("abc"), u("_ABC")))
+        self.assertTrue(d1.verify(b"ABC", u("_ABC")))
+        self.assertFalse(d1.verify(u("abd"), u("_ABC")))
+
+        # default implementation should still validate secret
+        self.assertRaises(TypeError, d1.encrypt, None)
+        self.assertRaises(TypeError, d1.verify, 1, u("_ABC"))
+
+    def test_14_verify_cache(self):
+        """test GenericHandler.verify_cache_size"""
+        calls = []
+        class d1(uh.StaticHandler):
+            name = "d1"
+            _hash_prefix = u("_")
+
+            def _calc_checksum(self, secret):
+                calls.append(secret)
+                return secret.upper()
+
+        # cache should be disabled by default
+        self.assertTrue(d1.verify(u("abc"), u("_ABC")))
+        self.assertTrue(d1.verify(u("abc"), u("_ABC")))
+        self.assertEqual(len(calls), 2)
+
+        # successful verifies should be cached once enabled
+        class d2(d1):
+            verify_cache_size = 2
+        del calls[:]
+        self.assertTrue(d2.verify(u("abc"), u("_ABC")))
+        self.assertTrue(d2.verify(u("abc"), u("_ABC")))
+        self.assertEqual(calls, [u("abc")])
+        self.assertNotIn("_verify_cache", d1.__dict__)
+
+        # failed verifies shouldn't be cached
+        del calls[:]
+        self.assertFalse(d2.verify(u("abd"), u("_ABC")))
+        self.assertFalse(d2.verify(u("abd"), u("_ABC")))
+        self.assertEqual(len(calls), 2)
+
+        # cache key should depend on both secret & hash
+        del calls[:]
+        self.assertTrue(d2.verify(u("ab"), u("_AB")))
+        self.assertFalse(d2.verify(u("ab"), u("_ABC")))
+        self.assertEqual(len(calls), 2)
+
+        # cache should be bounded, and raw secrets shouldn't be stored
+        self.assertTrue(d2.verify(u("xyz"), u("_XYZ")))
+        self.assertLessEqual(len(d2._verify_cache), 2)
+        for key in d2._verify_cache:
+            self.assertNotIn(b"xyz", key)
+
+        # errors should still be raised
+        self.assertRaises(TypeError, d2.verify, None, u("_ABC"))
+        self.assertRaises(TypeError, d2.verify, u("abc"), None)
+        self.assertRaises(ValueError, d2.verify, u("abc"), u("ABC"))
+
     def test_20_norm_salt(self):
         """test GenericHandler + HasSalt mixin"""
         # setup helpers
@@ -5,10 +5,22 @@
 from passlib.utils.compat import JYTHON
 # core
 from base64 import b64encode, b64decode
+from binascii import a2b_base64, b2a_base64
 from codecs import lookup as _lookup_codec
+from collections import deque
 from functools import update_wrapper
+try:
+    from hmac import compare_digest as _compare_digest # py27.7+, py33+
+except ImportError:
+    _compare_digest = None
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError: # py2 w/o "futures" backport
+    ThreadPoolExecutor = None
 import logging; log = logging.getLogger(__name__)
+from itertools import chain, islice
 import math
+from operator import itemgetter
 import os
 import sys
 import random
@@ -32,7 +44,8 @@ from warnings import warn
 from passlib.exc import ExpectedStringError
 from passlib.utils.compat import add_doc, join_bytes, join_byte_values, \
                                  join_byte_elems, irange, imap, PY3, u, \
-                                 join_unicode, unicode, byte_elem_value, nextgetter
+                                 join_unicode, unicode, byte_elem_value, \
+                                 iter_byte_values
 # local
 __all__ = [
     # constants
@@ -45,7 +58,6 @@ __all__ = [
     "classproperty",
 ##    "deprecated_function",
 ##    "relocated_function",
-##    "memoized_class_property",
 
     # unicode helpers
     'consteq',
@@ -224,24 +236,6 @@ class memoized_property(object):
         """py3 alias"""
         return self.im_func
 
-# works but not used
-##class memoized_class_property(object):
-##    """function decorator which calls function as classmethod,
-##    and replaces itself with result for current and all future invocations.
-##    """
-##    def __init__(self, func):
-##        self.im_func = func
-##
-##    def __get__(self, obj, cls):
-##        func = self.im_func
-##        value = func(cls)
-##        setattr(cls, func.__name__, value)
-##        return value
-##
-##    @property
-##    def __func__(self):
-##        "py3 compatible alias"
-
 #=============================================================================
 # unicode helpers
 #=============================================================================
@@ -273,6 +267,11 @@ def consteq(left, right):
         *inputs that might contain non-* ``ASCII`` *characters*.
 
     .. versionadded:: 1.6
+
+    .. versionchanged:: 1.7
+        When available, :func:`hmac.compare_digest` (Python 2.7.7+ & 3.3+)
+        is used to compare :class:`!bytes` inputs, and ``ASCII``-only
+        :class:`unicode` inputs.
     """
     # NOTE:
     # resources & discussions considered in the design of this function:
@@ -286,10 +285,22 @@ def consteq(left, right):
     if isinstance(left, unicode):
         if not isinstance(right, unicode):
             raise TypeError("inputs must be both unicode or both bytes")
+        # NOTE: compare_digest() also accepts unicode, as long as it's ascii
+        #       (as hash checksums are); it raises TypeError for anything else,
+        #       in which case the loop below is used instead.
+        if _compare_digest:
+            try:
+                return _compare_digest(left, right)
+            except TypeError:
+                pass
         is_py3_bytes = False
     elif isinstance(left, bytes):
         if not isinstance(right, bytes):
             raise TypeError("inputs must be both unicode or both bytes")
+        # NOTE: stdlib's C implementation is both faster and less subject to
+        #       VM-dependant timing effects than the loop below.
+        if _compare_digest:
+            return _compare_digest(left, right)
         is_py3_bytes = PY3
     else:
         raise TypeError("inputs must be both unicode or both bytes")
@@ -542,12 +553,12 @@ def is_same_codec(left, right):
         return False
     return _lookup_codec(left).name == _lookup_codec(right).name
 
-_B80 = b'\x80'[0]
-_U80 = u('\x80')
+_ASCII_BYTES = join_byte_values(irange(0x80))
+_ASCII_CHARS = _ASCII_BYTES.decode("ascii")
 def is_ascii_safe(source):
     """Check if string (bytes or unicode) contains only 7-bit ascii"""
-    r = _B80 if isinstance(source, bytes) else _U80
-    return all(c < r for c in source)
+    # NOTE: strip() leaves something behind iff there's a char outside the set.
+    return not source.strip(_ASCII_BYTES if isinstance(source, bytes) else _ASCII_CHARS)
 
 def to_bytes(source, encoding="utf-8", param="value", source_encoding=None):
     """Helper to normalize input to bytes.
@@ -659,6 +670,9 @@ def to_hash_str(source, encoding="ascii"): # pragma: no cover -- deprecated & un
 # base64-variant encoding
 #=============================================================================
 
+#: standard base64 alphabet, as output by b2a_base64()
+_STD_BASE64_BYTES = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
 class Base64Engine(object):
     """Provides routines for encoding/decoding base64 data using
     arbitrary character mappings, selectable endianness, etc.
@@ -736,9 +750,11 @@ class Base64Engine(object):
     _encode64 = None # maps 6bit value -> byte elem
     _decode64 = None # maps byte elem -> 6bit value
 
-    # helpers filled in by init based on endianness
-    _encode_bytes = None # throws IndexError if bad value (shouldn't happen)
-    _decode_bytes = None # throws KeyError if bad char.
+    # translation table mapping standard base64 alphabet -> charmap (used by encode_bytes)
+    _encode_table = None
+
+    # translation table mapping charmap -> standard base64 alphabet (used by decode_bytes)
+    _decode_table = None
 
     #===================================================================
     # init
@@ -757,25 +773,16 @@ class Base64Engine(object):
         self._encode64 = charmap.__getitem__
         lookup = dict((value, idx) for idx, value in enumerate(charmap))
         self._decode64 = lookup.__getitem__
+        encode_table = list(irange(256))
+        decode_table = list(irange(256))
+        for std, value in zip(iter_byte_values(_STD_BASE64_BYTES),
+                              iter_byte_values(charmap)):
+            encode_table[std] = value
+            decode_table[value] = std
+        self._encode_table = join_byte_values(encode_table)
+        self._decode_table = join_byte_values(decode_table)
 
-        # validate big, set appropriate helper functions.
         self.big = big
-        if big:
-            self._encode_bytes = self._encode_bytes_big
-            self._decode_bytes = self._decode_bytes_big
-        else:
-            self._encode_bytes = self._encode_bytes_little
-            self._decode_bytes = self._decode_bytes_little
-
-        # TODO: support padding character
-        ##if padding is not None:
-        ##    if isinstance(padding, unicode):
-        ##        padding = padding.encode("latin-1")
-        ##    elif not isinstance(padding, bytes):
-        ##        raise TypeError("padding char must be unicode or bytes")
-        ##    if len(padding) != 1:
-        ##        raise ValueError("padding must be single character")
-        ##self.padding = padding
 
     @property
     def charmap(self):
@@ -793,97 +800,25 @@ class Base64Engine(object):
         """
         if not isinstance(source, bytes):
             raise TypeError("source must be bytes, not %s" % (type(source),))
-        chunks, tail = divmod(len(source), 3)
-        if PY3:
-            next_value = nextgetter(iter(source))
+        # NOTE: rather than encoding each 6-bit value in python, this uses
+        #       the stdlib's (C) base64 encoder, and then translates the
+        #       output from the standard alphabet to the engine's charmap.
+        #       source is zero-padded to a multiple of 3 bytes, and the unused
+        #       chars are stripped afterwards; this is the same as encoding the
+        #       trailing partial block with zero-valued padding bits.
+        size = len(source)
+        tail = size % 3
+        if tail:
+            source += _BNULL * (3 - tail)
+        if self.big:
+            out = b2a_base64(source)
         else:
-            next_value = nextgetter(ord(elem) for elem in source)
-        gen = self._encode_bytes(next_value, chunks, tail)
-        out = join_byte_elems(imap(self._encode64, gen))
-        ##if tail:
-        ##    padding = self.padding
-        ##    if padding:
-        ##        out += padding * (3-tail)
+            # little-endian encoding is the same as big-endian encoding of
+            # the reversed bytes, with the output reversed (minus the trailing "\n")
+            out = b2a_base64(source[::-1])[-2::-1]
+        out = out[:(size * 8 + 5) // 6].translate(self._encode_table)
         return out
 
-    def _encode_bytes_little(self, next_value, chunks, tail):
-        """helper used by encode_bytes() to handle little-endian encoding"""
-        #
-        # output bit layout:
-        #
-        # first byte:   v1 543210
-        #
-        # second byte:  v1 ....76
-        #              +v2 3210..
-        #
-        # third byte:   v2 ..7654
-        #              +v3 10....
-        #
-        # fourth byte:  v3 765432
-        #
-        idx = 0
-        while idx < chunks:
-            v1 = next_value()
-            v2 = next_value()
-            v3 = next_value()
-            yield v1 & 0x3f
-            yield ((v2 & 0x0f)<<2)|(v1>>6)
-            yield ((v3 & 0x03)<<4)|(v2>>4)
-            yield v3>>2
-            idx += 1
-        if tail:
-            v1 = next_value()
-            if tail == 1:
-                # note: 4 msb of last byte are padding
-                yield v1 & 0x3f
-                yield v1>>6
-            else:
-                assert tail == 2
-                # note: 2 msb of last byte are padding
-                v2 = next_value()
-                yield v1 & 0x3f
-                yield ((v2 & 0x0f)<<2)|(v1>>6)
-                yield v2>>4
-
-    def _encode_bytes_big(self, next_value, chunks, tail):
-        """helper used by encode_bytes() to handle big-endian encoding"""
-        #
-        # output bit layout:
-        #
-        # first byte:   v1 765432
-        #
-        # second byte:  v1 10....
-        #              +v2 ..7654
-        #
-        # third byte:   v2 3210..
-        #              +v3 ....76
-        #
-        # fourth byte:  v3 543210
-        #
-        idx = 0
-        while idx < chunks:
-            v1 = next_value()
-            v2 = next_value()
-            v3 = next_value()
-            yield v1>>2
-            yield ((v1&0x03)<<4)|(v2>>4)
-            yield ((v2&0x0f)<<2)|(v3>>6)
-            yield v3 & 0x3f
-            idx += 1
-        if tail:
-            v1 = next_value()
-            if tail == 1:
-                # note: 4 lsb of last byte are padding
-                yield v1>>2
-                yield (v1&0x03)<<4
-            else:
-                assert tail == 2
-                # note: 2 lsb of last byte are padding
-                v2 = next_value()
-                yield v1>>2
-                yield ((v1&0x03)<<4)|(v2>>4)
-                yield ((v2&0x0f)<<2)
-
     #===================================================================
     # decoding byte strings
     #===================================================================
@@ -896,89 +831,26 @@ class Base64Engine(object):
         """
         if not isinstance(source, bytes):
             raise TypeError("source must be bytes, not %s" % (type(source),))
-        ##padding = self.padding
-        ##if padding:
-        ##    # TODO: add padding size check?
-        ##    source = source.rstrip(padding)
-        chunks, tail = divmod(len(source), 4)
-        if tail == 1:
+        size = len(source)
+        if size & 3 == 1:
             # only 6 bits left, can't encode a whole byte!
             raise ValueError("input string length cannot be == 1 mod 4")
-        next_value = nextgetter(imap(self._decode64, source))
-        try:
-            return join_byte_values(self._decode_bytes(next_value, chunks, tail))
-        except KeyError as err:
-            raise ValueError("invalid character: %r" % (err.args[0],))
-
-    def _decode_bytes_little(self, next_value, chunks, tail):
-        """helper used by decode_bytes() to handle little-endian encoding"""
-        #
-        # input bit layout:
-        #
-        # first byte:   v1 ..543210
-        #              +v2 10......
-        #
-        # second byte:  v2 ....5432
-        #              +v3 3210....
-        #
-        # third byte:   v3 ......54
-        #              +v4 543210..
-        #
-        idx = 0
-        while idx < chunks:
-            v1 = next_value()
-            v2 = next_value()
-            v3 = next_value()
-            v4 = next_value()
-            yield v1 | ((v2 & 0x3) << 6)
-            yield (v2>>2) | ((v3 & 0xF) << 4)
-            yield (v3>>4) | (v4<<2)
-            idx += 1
-        if tail:
-            # tail is 2 or 3
-            v1 = next_value()
-            v2 = next_value()
-            yield v1 | ((v2 & 0x3) << 6)
-            # NOTE: if tail == 2, 4 msb of v2 are ignored (should be 0)
-            if tail == 3:
-                # NOTE: 2 msb of v3 are ignored (should be 0)
-                v3 = next_value()
-                yield (v2>>2) | ((v3 & 0xF) << 4)
-
-    def _decode_bytes_big(self, next_value, chunks, tail):
-        """helper used by decode_bytes() to handle big-endian encoding"""
-        #
-        # input bit layout:
-        #
-        # first byte:   v1 543210..
-        #              +v2 ......54
-        #
-        # second byte:  v2 3210....
-        #              +v3 ....5432
-        #
-        # third byte:   v3 10......
-        #              +v4 ..543210
-        #
-        idx = 0
-        while idx < chunks:
-            v1 = next_value()
-            v2 = next_value()
-            v3 = next_value()
-            v4 = next_value()
-            yield (v1<<2) | (v2>>4)
-            yield ((v2&0xF)<<4) | (v3>>2)
-            yield ((v3&0x3)<<6) | v4
-            idx += 1
-        if tail:
-            # tail is 2 or 3
-            v1 = next_value()
-            v2 = next_value()
-            yield (v1<<2) | (v2>>4)
-            # NOTE: if tail == 2, 4 lsb of v2 are ignored (should be 0)
-            if tail == 3:
-                # NOTE: 2 lsb of v3 are ignored (should be 0)
-                v3 = next_value()
-                yield ((v2&0xF)<<4) | (v3>>2)
+        # NOTE: this is the reverse of encode_bytes(): after checking all chars
+        #       are in the charmap (via a single C-level scan), the source is
+        #       translated to the standard alphabet, and decoded by the stdlib.
+        #       the trailing partial block is padded with zero-valued chars,
+        #       and the extra bytes (including any padding bits) are dropped.
+        bad = source.translate(None, self.bytemap)
+        if bad:
+            raise ValueError("invalid character: %r" % (bad[0],))
+        source = source.translate(self._decode_table) + \
+                 _STD_BASE64_BYTES[:1] * (-size & 3)
+        if self.big:
+            return a2b_base64(source)[:(size * 6) >> 3]
+        else:
+            # little-endian decoding is the same as big-endian decoding of
+            # the reversed string, with the output reversed.
+            return a2b_base64(source[::-1])[::-1][:(size * 6) >> 3]
 
     #===================================================================
     # encode/decode helpers
@@ -1051,18 +923,6 @@ class Base64Engine(object):
     def repair_unused(self, source):
         return self.check_repair_unused(source)[1]
 
-    ##def transcode(self, source, other):
-    ##    return ''.join(
-    ##        other.charmap[self.charmap.index(char)]
-    ##        for char in source
-    ##    )
-
-    ##def random_encoded_bytes(self, size, random=None, unicode=False):
-    ##    "return random encoded string of given size"
-    ##    data = getrandstr(random or rng,
-    ##                      self.charmap if unicode else self.bytemap, size)
-    ##    return self.repair_unused(data)
-
     #===================================================================
     # transposed encoding/decoding
     #===================================================================
@@ -1070,7 +930,11 @@ class Base64Engine(object):
         """encode byte string, first transposing source using offset list"""
         if not isinstance(source, bytes):
             raise TypeError("source must be bytes, not %s" % (type(source),))
-        tmp = join_byte_elems(source[off] for off in offsets)
+        if len(offsets) > 1:
+            # itemgetter() performs the whole gather in C
+            tmp = join_byte_elems(itemgetter(*offsets)(source))
+        else:
+            tmp = join_byte_elems(source[off] for off in offsets)
         return self.encode_bytes(tmp)
 
     def decode_transposed_bytes(self, source, offsets):
@@ -1108,6 +972,13 @@ class Base64Engine(object):
         chars = (bits+pad)/6
         if len(source) != chars:
             raise ValueError("source must be %d chars" % (chars,))
+        if not bits & 7:
+            # NOTE: byte-aligned sizes can go through decode_bytes(),
+            #       which discards the padding bits the same way as below.
+            raw = self.decode_bytes(source)
+            if not self.big:
+                raw = raw[::-1]
+            return bytes_to_int(raw)
         decode = self._decode64
         out = 0
         try:
@@ -1194,6 +1065,15 @@ class Base64Engine(object):
             a string of length ``int(ceil(bits/6.0))``.
         """
         assert value >= 0, "caller did not sanitize input"
+        if not bits & 7:
+            # NOTE: for byte-aligned sizes, packing the integer into bytes
+            #       and handing it to encode_bytes() yields the same 6-bit
+            #       groups (and padding placement) as the loop below,
+            #       but extracts them in C instead of one at a time.
+            raw = int_to_bytes(value, bits>>3)
+            if not self.big:
+                raw = raw[::-1]
+            return self.encode_bytes(raw)
         pad = -bits % 6
         bits += pad
         if self.big:
@@ -1289,6 +1169,9 @@ _A64_STRIP = b"=\n"
 _A64_PAD1 = b"="
 _A64_PAD2 = b"=="
 
+# translation table used by ab64_encode() -- maps "+" -> "."
+_A64_ENCODE_TABLE = join_byte_values(irange(256)).replace(b"+", b".")
+
 def ab64_encode(data):
     """encode using variant of base64
 
@@ -1298,7 +1181,10 @@ def ab64_encode(data):
 
     it is primarily used by Passlib's custom pbkdf2 hashes.
     """
-    return b64encode(data, _A64_ALTCHARS).strip(_A64_STRIP)
+    # NOTE: using precomputed table w/ translate(), rather than b64encode(altchars),
+    #       since the latter builds a new translation table on every call;
+    #       and translate() strips the padding & newline in the same pass.
+    return b2a_base64(data).translate(_A64_ENCODE_TABLE, _A64_STRIP)
 
 def ab64_decode(data):
     """decode using variant of base64
@@ -1425,6 +1311,56 @@ else:
     # On most other platforms the best timer is time.time()
     from time import time as tick
 
+def _cpu_count():
+    """return number of cpus (or 1 if unknown), used to size worker pools"""
+    import multiprocessing
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError: # pragma: no cover
+        return 1
+
+#: number of pending calls _thread_map() keeps queued per worker thread
+_THREAD_MAP_QUEUE_FACTOR = 4
+
+def _thread_map(func, items, threaded=True, max_workers=None):
+    """helper for the ``*_many()`` batch methods --
+    yields ``func(item)`` for each of *items*, in order.
+
+    if *threaded* is true, the calls are spread across a thread pool
+    of *max_workers* threads (defaults to the cpu count). callers should only
+    request this when *func* spends its time in C code which releases the GIL,
+    since pure-python calls gain nothing from threads.
+    otherwise (or if there are less than 2 items / workers, or
+    :mod:`!concurrent.futures` isn't available), *func* is called serially.
+
+    either way, *items* is consumed lazily: the thread pool only has
+    ``max_workers * _THREAD_MAP_QUEUE_FACTOR`` calls queued at a time,
+    and any still queued are cancelled if the caller stops early.
+    """
+    items = iter(items)
+    if threaded and ThreadPoolExecutor is not None:
+        if max_workers is None:
+            max_workers = _cpu_count()
+        if max_workers > 1:
+            head = list(islice(items, max_workers * _THREAD_MAP_QUEUE_FACTOR))
+            if len(head) > 1:
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+                pending = deque(executor.submit(func, item) for item in head)
+                try:
+                    for item in items:
+                        pending.append(executor.submit(func, item))
+                        yield pending.popleft().result()
+                    while pending:
+                        yield pending.popleft().result()
+                finally:
+                    for future in pending:
+                        future.cancel()
+                    executor.shutdown(wait=True)
+                return
+            items = chain(head, items)
+    for item in items:
+        yield func(item)
+
 def parse_version(source):
     """helper to parse version string"""
     m = re.search(r"(\d+(?:\.\d+)+)", source)
@@ -1494,11 +1430,6 @@ def getrandbytes(rng, count):
     """return byte-string containing *count* number of randomly generated bytes, using specified rng"""
     # NOTE: would be nice if this was present in stdlib Random class
 
-    ###just in case rng provides this...
-    ##meth = getattr(rng, "getrandbytes", None)
-    ##if meth:
-    ##    return meth(count)
-
     if not count:
         return _BEMPTY
     def helper():
@@ -1511,6 +1442,31 @@ def getrandbytes(rng, count):
             i += 1
     return join_byte_values(helper())
 
+# cache of translate() tables used by getrandstr(), keyed by charset
+_randstr_tables = {}
+
+def _get_randstr_table(charset):
+    """getrandstr() helper -- returns table mapping every byte value to a
+    char in *charset*, or ``None`` if charset isn't ascii, or its size doesn't
+    evenly divide 256 (in which case the mapping would be biased).
+    """
+    try:
+        return _randstr_tables[charset]
+    except KeyError:
+        pass
+    table = None
+    if not 256 % len(charset):
+        try:
+            raw = charset.encode("ascii") if isinstance(charset, unicode) else charset
+        except UnicodeEncodeError:
+            pass
+        else:
+            table = raw * (256 // len(raw))
+    if len(_randstr_tables) >= 64:
+        _randstr_tables.clear()
+    _randstr_tables[charset] = table
+    return table
+
 def getrandstr(rng, charset, count):
     """return string containing *count* number of chars/bytes, whose elements are drawn from specified charset, using specified rng"""
     # NOTE: tests determined this is 4x faster than rng.sample(),
@@ -1525,6 +1481,13 @@ def getrandstr(rng, charset, count):
     if letters == 1:
         return charset * count
 
+    # fast path for common charsets (e.g. hash64): draw random bytes,
+    # and map them to chars via a single translate() call.
+    table = _get_randstr_table(charset)
+    if table is not None and count:
+        result = int_to_bytes(rng.getrandbits(count << 3), count).translate(table)
+        return result.decode("ascii") if isinstance(charset, unicode) else result
+
     # get random value, and write out to buffer
     def helper():
         # XXX: break into chunks for large number of letters?
@@ -1592,11 +1555,6 @@ def is_crypt_context(obj):
     # XXX: change to use isinstance(obj, CryptContext)?
     return all(hasattr(obj, name) for name in _context_attrs)
 
-##def has_many_backends(handler):
-##    "check if handler provides multiple baceknds"
-##    # NOTE: should also provide get_backend(), .has_backend(), and .backends attr
-##    return hasattr(handler, "set_backend")
-
 def has_rounds_info(handler):
     """check if handler provides the optional :ref:`rounds information <rounds-attributes>` attributes"""
     return ('rounds' in handler.setting_kwds and
@@ -1607,18 +1565,6 @@ def has_salt_info(handler):
     return ('salt' in handler.setting_kwds and
             getattr(handler, "min_salt_size", None) is not None)
 
-##def has_raw_salt(handler):
-##    "check if handler takes in encoded salt as unicode (False), or decoded salt as bytes (True)"
-##    sc = getattr(handler, "salt_chars", None)
-##    if sc is None:
-##        return None
-##    elif isinstance(sc, unicode):
-##        return False
-##    elif isinstance(sc, bytes):
-##        return True
-##    else:
-##        raise TypeError("handler.salt_chars must be None/unicode/bytes")
-
 #=============================================================================
 # eof
 #=============================================================================
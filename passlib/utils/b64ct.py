@@ -0,0 +1,101 @@
+"""passlib.utils.b64ct -- constant-time base64 decoding
+
+The stdlib's base64 decoder maps each input character through a lookup table,
+which can leak information about the encoded value via cache-timing.
+While salts are public, a hash's checksum is the value being compared against,
+so the routines in this module decode base64 using only arithmetic on each
+character (no table lookups, and no branches which depend on the data),
+at the cost of being slower than :func:`base64.b64decode`.
+"""
+#=============================================================================
+# imports
+#=============================================================================
+# core
+# site
+# pkg
+from passlib.utils import int_to_bytes
+from passlib.utils.compat import iter_byte_values
+# local
+__all__ = [
+    "decode_block",
+    "b64decode",
+    "ab64_decode",
+]
+
+#=============================================================================
+# helpers
+#=============================================================================
+_BPAD = b"="
+
+def _decode_char(c, c62, c63):
+    """decode ordinal of base64 character to its 6-bit value,
+    or ``-1`` if it's not part of the alphabet.
+
+    each term below is ``(range_mask & (value + 1))``, where ``range_mask``
+    is ``-1`` if *c* is within the range, and ``0`` otherwise
+    (``(lower - c) & (c - upper)`` is negative only when ``lower < c < upper``).
+    """
+    return (-1 +
+        ((((0x40 - c) & (c - 0x5b)) >> 8) & (c - 64)) + # 'A'..'Z' -> 0..25
+        ((((0x60 - c) & (c - 0x7b)) >> 8) & (c - 70)) + # 'a'..'z' -> 26..51
+        ((((0x2f - c) & (c - 0x3a)) >> 8) & (c + 5)) +  # '0'..'9' -> 52..61
+        ((((c62 - 1 - c) & (c - c62 - 1)) >> 8) & 63) + # c62 -> 62
+        ((((c63 - 1 - c) & (c - c63 - 1)) >> 8) & 64))  # c63 -> 63
+
+def _decode(data, altchars):
+    """decode unpadded base64 *data* using specified *altchars*"""
+    size = len(data)
+    if size & 3 == 1:
+        raise ValueError("invalid base64 input")
+    if not size:
+        return b""
+    c62, c63 = iter_byte_values(altchars)
+
+    # accumulate all 6-bit values into a single integer, tracking errors via
+    # the sign bit, rather than branching on each character.
+    accum = err = 0
+    for c in iter_byte_values(data):
+        value = _decode_char(c, c62, c63)
+        err |= value
+        accum = (accum << 6) | (value & 0x3f)
+    if err < 0:
+        raise ValueError("invalid base64 input")
+
+    # drop the unused bits from the final partial block (if any)
+    bits = size * 6
+    return int_to_bytes(accum >> (bits & 7), bits >> 3)
+
+#=============================================================================
+# public api
+#=============================================================================
+def decode_block(block, altchars=b"+/"):
+    """decode a single 4 character base64 block to 3 bytes, in constant time.
+
+    :arg block: 4 character base64 :class:`!bytes`
+    :param altchars: the characters to use for values 62 & 63 (defaults to ``+/``).
+    :raises ValueError: if the block contains invalid characters.
+    """
+    if len(block) != 4:
+        raise ValueError("base64 block must be 4 characters")
+    return _decode(block, altchars)
+
+def b64decode(data, altchars=b"+/"):
+    """constant-time equivalent of :func:`base64.b64decode`.
+
+    unlike the stdlib function, this does not silently discard
+    characters outside of the base64 alphabet, but raises a :exc:`ValueError`;
+    and requires any trailing padding to be correct.
+    """
+    if len(data) & 3:
+        raise ValueError("invalid base64 input")
+    if data.endswith(_BPAD):
+        data = data[:-2] if data.endswith(_BPAD*2) else data[:-1]
+    return _decode(data, altchars)
+
+def ab64_decode(data):
+    """constant-time equivalent of :func:`passlib.utils.ab64_decode`"""
+    return _decode(data, b"./")
+
+#=============================================================================
+# eof
+#=============================================================================
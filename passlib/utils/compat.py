@@ -162,7 +162,8 @@ else:
         return s
 
     def join_byte_values(values):
-        return join_bytes(chr(v) for v in values)
+        # NOTE: bytearray() range-checks & packs the values in C
+        return bytes(bytearray(values))
 
     join_byte_elems = join_bytes
 
@@ -170,7 +171,8 @@ else:
 
     def iter_byte_values(s):
         assert isinstance(s, bytes)
-        return (ord(c) for c in s)
+        # NOTE: bytearray yields ints when iterated, w/o calling ord() per byte
+        return bytearray(s)
 
     def iter_byte_chars(s):
         assert isinstance(s, bytes)
@@ -4,6 +4,8 @@
 #=============================================================================
 from __future__ import with_statement
 # core
+import hashlib
+import hmac
 import logging; log = logging.getLogger(__name__)
 from warnings import warn
 # site
@@ -104,6 +106,21 @@ def to_unicode_for_identify(hash):
     else:
         raise exc.ExpectedStringError(hash, "hash")
 
+#: random key used by _verify_cache_key(), generated once per process
+_VERIFY_CACHE_KEY = getrandbytes(rng, 32)
+
+def _verify_cache_key(secret, hash):
+    """GenericHandler._verify_cached() helper --
+    returns keyed hmac of secret & hash, so the raw secret is never stored.
+    """
+    if isinstance(secret, unicode):
+        secret = secret.encode("utf-8")
+    if isinstance(hash, unicode):
+        hash = hash.encode("utf-8")
+    # NOTE: length prefix keeps the boundary between secret & hash unambiguous
+    msg = str(len(secret)).encode("ascii") + b":" + secret + hash
+    return hmac.new(_VERIFY_CACHE_KEY, msg, hashlib.sha256).digest()
+
 def parse_mc2(hash, prefix, sep=_UDOLLAR, handler=None):
     """parse hash using 2-part modular crypt format.
 
@@ -327,6 +344,22 @@ class GenericHandler(PasswordHash):
         This should be a string of the same datatype as :attr:`checksum`,
         or ``None``.
 
+    .. attribute:: verify_cache_size
+
+        [optional]
+        If set to a positive integer, :meth:`verify` will remember up to this
+        many ``(secret, hash)`` pairs which it has successfully verified,
+        and return ``True`` for them without recalculating the checksum.
+        This is meant for applications which verify the same password
+        over and over (e.g. HTTP Basic Auth), and defaults to ``0`` (disabled).
+
+        .. warning::
+
+            While the cache only stores a keyed HMAC of each pair
+            (using a key generated when the process starts),
+            anyone able to read the process's memory could use it to test
+            password guesses *without* the cost of the hash algorithm.
+
     Instance Attributes
     ===================
     .. attribute:: checksum
@@ -385,6 +418,9 @@ class GenericHandler(PasswordHash):
     # private flag used by HasRawChecksum
     _checksum_is_bytes = False
 
+    # if set, verify() will cache this many successfully verified (secret, hash) pairs
+    verify_cache_size = 0
+
     #===================================================================
     # instance attrs
     #===================================================================
@@ -439,8 +475,10 @@ class GenericHandler(PasswordHash):
 
         # check charset
         if not raw:
+            # NOTE: strip() removes every valid char in a single C-level pass,
+            #       so anything left over is invalid.
             cs = self.checksum_chars
-            if cs and any(c not in cs for c in checksum):
+            if cs and checksum.strip(cs):
                 raise ValueError("invalid characters in %s checksum" %
                                  (self.name,))
 
@@ -528,17 +566,30 @@ class GenericHandler(PasswordHash):
 
     @classmethod
     def genhash(cls, secret, config, **context):
-        validate_secret(secret)
+        secret = cls._norm_secret(secret)
         self = cls.from_string(config, **context)
         self.checksum = self._calc_checksum(secret)
         return self.to_string()
 
+    @classmethod
+    def _norm_secret(cls, secret):
+        """validate secret passed to encrypt/verify/genhash,
+        and return the value which should be passed to :meth:`_calc_checksum`.
+
+        the default implementation returns the secret unchanged;
+        subclasses may override this to (e.g.) encode unicode secrets
+        once at the api boundary, rather than in :meth:`!_calc_checksum`.
+        """
+        validate_secret(secret)
+        return secret
+
     def _calc_checksum(self, secret): # pragma: no cover
         """given secret; calcuate and return encoded checksum portion of hash
         string, taking config from object state
 
         calc checksum implementations may assume secret is always
-        either unicode or bytes, checks are performed by verify/etc.
+        either unicode or bytes (or whatever :meth:`_norm_secret` returns),
+        checks are performed by verify/etc.
         """
         raise NotImplementedError("%s must implement _calc_checksum()" %
                                   (self.__class__,))
@@ -548,7 +599,7 @@ class GenericHandler(PasswordHash):
     #===================================================================
     @classmethod
     def encrypt(cls, secret, **kwds):
-        validate_secret(secret)
+        secret = cls._norm_secret(secret)
         self = cls(use_defaults=True, **kwds)
         self.checksum = self._calc_checksum(secret)
         return self.to_string()
@@ -558,13 +609,41 @@ class GenericHandler(PasswordHash):
         # NOTE: classes with multiple checksum encodings should either
         # override this method, or ensure that from_string() / _norm_checksum()
         # ensures .checksum always uses a single canonical representation.
-        validate_secret(secret)
+        secret = cls._norm_secret(secret)
+        if cls.verify_cache_size and not context and \
+                isinstance(hash, unicode_or_bytes_types):
+            return cls._verify_cached(secret, hash)
         self = cls.from_string(hash, **context)
         chk = self.checksum
         if chk is None:
             raise exc.MissingDigestError(cls)
         return consteq(self._calc_checksum(secret), chk)
 
+    @classmethod
+    def _verify_cached(cls, secret, hash):
+        """verify() helper used when :attr:`verify_cache_size` is set"""
+        # NOTE: a new cache is created for each class which enables this,
+        #       so subclasses don't share their parent's cache.
+        cache = cls.__dict__.get("_verify_cache")
+        if cache is None:
+            cache = cls._verify_cache = {}
+        key = _verify_cache_key(secret, hash)
+        if key in cache:
+            return True
+        # NOTE: context kwds are rejected by the caller, since they may
+        #       affect the result without being part of the key.
+        self = cls.from_string(hash)
+        chk = self.checksum
+        if chk is None:
+            raise exc.MissingDigestError(cls)
+        if not consteq(self._calc_checksum(secret), chk):
+            # (failed attempts aren't cached, so they can't flush the cache)
+            return False
+        if len(cache) >= cls.verify_cache_size:
+            cache.clear()
+        cache[key] = True
+        return True
+
     #===================================================================
     # experimental - the following methods are not finished or tested,
     # but way work correctly for some hashes
@@ -685,6 +764,16 @@ class StaticHandler(GenericHandler):
                 raise exc.InvalidHashError(cls)
         return cls(checksum=hash, **context)
 
+    @classmethod
+    def identify(cls, hash):
+        # since the whole hash is a fixed-size checksum, strings of the wrong
+        # length can be rejected without parsing & constructing an instance.
+        hash = to_unicode_for_identify(hash)
+        size = cls.checksum_size
+        if size and len(hash) != len(cls._hash_prefix) + size:
+            return False
+        return super(StaticHandler, cls).identify(hash)
+
     @classmethod
     def _norm_hash(cls, hash):
         """helper for subclasses to normalize case if needed"""
@@ -880,7 +969,9 @@ class HasManyIdents(GenericHandler):
     @classmethod
     def identify(cls, hash):
         hash = to_unicode_for_identify(hash)
-        return any(hash.startswith(ident) for ident in cls.ident_values)
+        # NOTE: passing all the idents to startswith() at once checks them in C
+        #       (tuple() is a no-op if ident_values is already a tuple).
+        return hash.startswith(tuple(cls.ident_values))
 
     @classmethod
     def _parse_ident(cls, hash):
@@ -1029,7 +1120,8 @@ class HasSalt(GenericHandler):
             normalized or generated salt
         """
         # generate new salt if none provided
-        if salt is None:
+        generated = salt is None
+        if generated:
             if not self.use_defaults:
                 raise TypeError("no salt specified")
             if salt_size is None:
@@ -1049,8 +1141,10 @@ class HasSalt(GenericHandler):
                     raise exc.ExpectedTypeError(salt, "unicode", "salt")
 
             # check charset
+            # NOTE: skipped for generated salts, since default_salt_chars
+            # is required to be a subset of salt_chars.
             sc = self.salt_chars
-            if sc is not None and any(c not in sc for c in salt):
+            if sc is not None and not generated and salt.strip(sc):
                 raise ValueError("invalid characters in %s salt" % self.name)
 
         # check min size
@@ -10,7 +10,7 @@ maybe rename to "kdf" since it's getting more key derivation functions added.
 import hashlib
 import logging; log = logging.getLogger(__name__)
 import re
-from struct import pack
+from struct import Struct
 from warnings import warn
 # site
 try:
@@ -18,10 +18,14 @@ try:
 except ImportError:
     _EVP = None
 #_EVP = None
+try:
+    from fastpbkdf2 import pbkdf2_hmac as _fast_pbkdf2_hmac
+except ImportError:
+    _fast_pbkdf2_hmac = None
 # pkg
 from passlib.exc import PasslibRuntimeWarning, ExpectedTypeError
 from passlib.utils import join_bytes, to_native_str, bytes_to_int, int_to_bytes, join_byte_values
-from passlib.utils.compat import BytesIO, irange, int_types
+from passlib.utils.compat import BytesIO, irange, int_types, PY3
 # local
 __all__ = [
     # hash utils
@@ -35,12 +39,14 @@ __all__ = [
     # kdfs
     "pbkdf1",
     "pbkdf2",
+    "pbkdf2_hmac",
 ]
 
 def _clear_caches():
     """unittest helper -- clears get_hash_info() / get_prf() caches"""
     _ghi_cache.clear()
     _prf_cache.clear()
+    _pbkdf2_hmac_backend_cache.clear()
 
 #=============================================================================
 # hash helpers
@@ -354,9 +360,10 @@ def get_prf(name):
 # keyed prf generation
 #------------------------------------------------------------------------
 
-def _get_keyed_hmac_prf(digest, key):
-    """get_keyed_prf() helper -- returns efficent hmac() function
-    hardcoded with specific digest and key.
+def _get_hmac_protos(digest, key):
+    """_get_keyed_hmac_prf() helper -- returns ``(inner_proto, outer_proto, digest_size)``,
+    where the protos are hash objects pre-loaded with the padded key;
+    callers should ``.copy()`` them rather than updating them directly.
     """
     # all the following was adapted from stdlib's hmac module
 
@@ -372,9 +379,13 @@ def _get_keyed_hmac_prf(digest, key):
     if klen < block_size:
         key += _BNULL * (block_size - klen)
 
-    # return optimized hmac function for given key
-    inner_proto = const(key.translate(_TRANS_36))
-    outer_proto = const(key.translate(_TRANS_5C))
+    return const(key.translate(_TRANS_36)), const(key.translate(_TRANS_5C)), digest_size
+
+def _get_keyed_hmac_prf(digest, key):
+    """get_keyed_prf() helper -- returns efficent hmac() function
+    hardcoded with specific digest and key.
+    """
+    inner_proto, outer_proto, digest_size = _get_hmac_protos(digest, key)
     def kprf(msg):
         inner = inner_proto.copy()
         inner.update(msg)
@@ -482,23 +493,54 @@ def pbkdf1(secret, salt, rounds, keylen=None, hash="sha1"):
 #       start approaching 24 bits or so, this limit will be raised.
 _MAX_BLOCKS = 0xffffffff # 2**32-1
 
-def pbkdf2(secret, salt, rounds, keylen=None, prf="hmac-sha1"):
-    """pkcs#5 password-based key derivation v2.0
+# hashlib.pbkdf2_hmac() was added in Python 2.7.8 & 3.4;
+# it's implemented in C (using OpenSSL when available), and is much faster than ours.
+_stdlib_pbkdf2_hmac = getattr(hashlib, "pbkdf2_hmac", None)
 
-    :arg secret: passphrase to use to generate key
-    :arg salt: salt string to use when generating key
-    :param rounds: number of rounds to use to generate key
-    :arg keylen:
-        number of bytes to generate.
-        if set to ``None``, will use digest size of selected prf.
-    :param prf:
-        psuedo-random family to use for key strengthening.
-        this can be any string or callable accepted by :func:`get_prf`.
-        this defaults to ``"hmac-sha1"`` (the only prf explicitly listed in
-        the PBKDF2 specification)
+# digests supported by the (optional) fastpbkdf2 library, which
+# is faster still than hashlib's implementation.
+_fast_pbkdf2_digests = ("sha1", "sha256", "sha512")
 
-    :returns:
-        raw bytes of generated key
+# cache mapping digest name -> fastest C pbkdf2_hmac() function supporting it (or None)
+_pbkdf2_hmac_backend_cache = {}
+
+# helper for builtin pbkdf2 loop -- equivalent to ``bytes_to_int(value)``,
+# but under py3 it skips the wrapper's python-level call overhead in the inner loop.
+if PY3:
+    _from_bytes = int.from_bytes
+else:
+    def _from_bytes(value, byteorder):
+        return bytes_to_int(value)
+
+# helper for builtin pbkdf2 loop -- encodes 1-based block index as 32-bit big-endian int
+_pack_block_index = Struct(">L").pack
+
+def _get_pbkdf2_hmac_backend(digest):
+    """helper for pbkdf2() -- returns fastest available C implementation
+    of pbkdf2-hmac-{digest}, with the same call signature as :func:`hashlib.pbkdf2_hmac`;
+    or ``None`` if there isn't one (meaning the builtin backend should be used).
+    """
+    try:
+        return _pbkdf2_hmac_backend_cache[digest]
+    except KeyError:
+        pass
+    if _fast_pbkdf2_hmac and digest in _fast_pbkdf2_digests:
+        backend = _fast_pbkdf2_hmac
+    elif _stdlib_pbkdf2_hmac:
+        backend = _stdlib_pbkdf2_hmac
+        try:
+            backend(digest, b'x', b'y', 1, 1)
+        except ValueError:
+            # digest not supported by this build of hashlib / openssl
+            backend = None
+    else:
+        backend = None
+    _pbkdf2_hmac_backend_cache[digest] = backend
+    return backend
+
+def _norm_pbkdf2_args(secret, salt, rounds, keylen, digest_size):
+    """helper for pbkdf2() & pbkdf2_hmac() -- validates arguments,
+    returns ``(keylen, block_count)``.
     """
     # validate secret & salt
     if not isinstance(secret, bytes):
@@ -512,9 +554,6 @@ def pbkdf2(secret, salt, rounds, keylen=None, prf="hmac-sha1"):
     if rounds < 1:
         raise ValueError("rounds must be at least 1")
 
-    # generated keyed prf helper
-    keyed_prf, digest_size = get_keyed_prf(prf, secret)
-
     # validate keylen
     if keylen is None:
         keylen = digest_size
@@ -523,29 +562,128 @@ def pbkdf2(secret, salt, rounds, keylen=None, prf="hmac-sha1"):
     elif keylen < 0:
         raise ValueError("keylen must be at least 0")
 
-    # m2crypto's pbkdf2-hmac-sha1 is faster than ours, so use it if available.
-    # NOTE: as of 2012-4-4, m2crypto has buffer overflow issue which frequently
-    #       causes segfaults if keylen > 32 (EVP_MAX_KEY_LENGTH).
-    #       therefore we're avoiding m2crypto for large keys until that's fixed.
-    #       (https://bugzilla.osafoundation.org/show_bug.cgi?id=13052)
-    if prf == "hmac-sha1" and _EVP and keylen < 32:
-        return _EVP.pbkdf2(secret, salt, rounds, keylen)
-
     # work out min block count s.t. keylen <= block_count * digest_size
     block_count = (keylen + digest_size - 1) // digest_size
     if block_count >= _MAX_BLOCKS:
         raise ValueError("keylen too long for digest")
+    return keylen, block_count
+
+def pbkdf2(secret, salt, rounds, keylen=None, prf="hmac-sha1"):
+    """pkcs#5 password-based key derivation v2.0
+
+    :arg secret: passphrase to use to generate key
+    :arg salt: salt string to use when generating key
+    :param rounds: number of rounds to use to generate key
+    :arg keylen:
+        number of bytes to generate.
+        if set to ``None``, will use digest size of selected prf.
+    :param prf:
+        psuedo-random family to use for key strengthening.
+        this can be any string or callable accepted by :func:`get_prf`.
+        this defaults to ``"hmac-sha1"`` (the only prf explicitly listed in
+        the PBKDF2 specification)
+
+    :returns:
+        raw bytes of generated key
+    """
+    # hmac prfs (the common case) are handled by pbkdf2_hmac()
+    if isinstance(prf, str) and prf.startswith(_HMAC_PREFIXES):
+        return pbkdf2_hmac(prf[5:], secret, salt, rounds, keylen)
+
+    # lookup prf digest size (this also validates the prf)
+    digest_size = get_prf(prf)[1]
+    keylen, block_count = _norm_pbkdf2_args(secret, salt, rounds, keylen,
+                                            digest_size)
+
+    # generated keyed prf helper
+    keyed_prf = get_keyed_prf(prf, secret)[0]
 
     # build up result from blocks
-    def gen():
+    def gen(from_bytes=_from_bytes):
         for i in irange(block_count):
-            digest = keyed_prf(salt + pack(">L", i+1))
-            accum = bytes_to_int(digest)
+            digest = keyed_prf(salt + _pack_block_index(i+1))
+            accum = from_bytes(digest, "big")
             # speed-critical loop of pbkdf2
-            # NOTE: currently converting digests to integers since that XORs faster.
+            # NOTE: currently converting digests to integers since that XORs faster
+            #       (and with less allocation) than bytearray / struct based approaches.
             for _ in irange(rounds-1):
                 digest = keyed_prf(digest)
-                accum ^= bytes_to_int(digest)
+                accum ^= from_bytes(digest, "big")
+            yield int_to_bytes(accum, digest_size)
+    return join_bytes(gen())[:keylen]
+
+def pbkdf2_hmac(digest, secret, salt, rounds, keylen=None):
+    """pkcs#5 password-based key derivation v2.0, using HMAC-{digest} as the prf.
+
+    This is equivalent to calling :func:`pbkdf2` with ``prf="hmac-{digest}"``,
+    but skips the prf-name parsing.
+    When available, the `fastpbkdf2 <https://pypi.python.org/pypi/fastpbkdf2>`_
+    library or :func:`hashlib.pbkdf2_hmac` (Python 2.7.8+ & 3.4+)
+    will be used as the backend, since they're significantly faster than
+    Passlib's builtin implementation.
+
+    :arg digest: name of digest to use (e.g. ``"sha256"``)
+    :arg secret: passphrase to use to generate key
+    :arg salt: salt string to use when generating key
+    :param rounds: number of rounds to use to generate key
+    :arg keylen:
+        number of bytes to generate.
+        if set to ``None``, will use digest size of selected prf.
+
+    :returns:
+        raw bytes of generated key
+
+    .. versionadded:: 1.7
+    """
+    # lookup digest size (this also validates the digest)
+    digest_size = get_hash_info(digest)[1]
+    keylen, block_count = _norm_pbkdf2_args(secret, salt, rounds, keylen,
+                                            digest_size)
+
+    # use fastpbkdf2 / stdlib's pbkdf2_hmac() if either supports this digest,
+    # since they're implemented in C.
+    # NOTE: hashlib rejects keylen=0, so letting our implementation handle that.
+    # NOTE: though pbkdf2's blocks are independent, they aren't farmed out to
+    #       threads here: the C backends only compute blocks 1..n together
+    #       (there's no way to request block i alone), and the builtin loop
+    #       holds the GIL (hashlib only releases it for inputs over 2k).
+    if keylen:
+        backend = _get_pbkdf2_hmac_backend(digest)
+        if backend:
+            return backend(digest, secret, salt, rounds, keylen)
+
+    # m2crypto's pbkdf2-hmac-sha1 is faster than ours, so use it if available.
+    # NOTE: as of 2012-4-4, m2crypto has buffer overflow issue which frequently
+    #       causes segfaults if keylen > 32 (EVP_MAX_KEY_LENGTH).
+    #       therefore we're avoiding m2crypto for large keys until that's fixed.
+    #       (https://bugzilla.osafoundation.org/show_bug.cgi?id=13052)
+    if digest == "sha1" and _EVP and keylen < 32:
+        return _EVP.pbkdf2(secret, salt, rounds, keylen)
+
+    # inline the keyed hmac into the loop,
+    # reusing the same key-loaded inner & outer contexts across all blocks.
+    inner_proto, outer_proto = _get_hmac_protos(digest, secret)[:2]
+    def gen(inner_copy=inner_proto.copy, outer_copy=outer_proto.copy,
+            from_bytes=_from_bytes):
+        for i in irange(block_count):
+            inner = inner_copy()
+            inner.update(salt + _pack_block_index(i+1))
+            outer = outer_copy()
+            outer.update(inner.digest())
+            block = outer.digest()
+            accum = from_bytes(block, "big")
+            # speed-critical loop of pbkdf2 -- hmac inlined to avoid
+            # a python function call per round.
+            # NOTE: the whole block is XORed as a single integer, which is already
+            #       word-wide (in C); unpacking to 64-bit words via struct and
+            #       XORing them individually measured ~3x slower for sha512.
+            for _ in irange(rounds-1):
+                inner = inner_copy()
+                inner.update(block)
+                outer = outer_copy()
+                outer.update(inner.digest())
+                block = outer.digest()
+                accum ^= from_bytes(block, "big")
             yield int_to_bytes(accum, digest_size)
     return join_bytes(gen())[:keylen]
 